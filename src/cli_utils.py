@@ -2,6 +2,10 @@ import sys
 import time
 import threading
 import os
+import math
+import functools
+from bisect import bisect_left
+import numpy as np
 
 def make_hyperlink(text, target):
     """
@@ -25,12 +29,28 @@ class Style:
     RED = '\033[91m'
     YELLOW = '\033[93m'
 
+# Approx constants
+DAYS_PER_YEAR = 365.25
+DAYS_PER_MONTH = 30.44
+
+# Unit names indexed by [unit][plural] with unit 0=day, 1=month, 2=year
+_UNITS = (('day', 'days'), ('month', 'months'), ('year', 'years'))
+_UNITS_SHORT = (('d', 'd'), ('mo', 'mo'), ('yr', 'yr'))
+
+def _join_units(major, major_unit, minor, minor_unit, tbl):
+    """Joins 'N unit[, M unit]' using the plural lookup table."""
+    major_str = f"{major} {tbl[major_unit][major != 1]}"
+    if minor == 0:
+        return major_str
+    return f"{major_str}, {minor} {tbl[minor_unit][minor != 1]}"
+
 def format_duration(days, short=False):
     """
     Formats a duration in days into a human-friendly string.
 
     Args:
-        days (float): Duration in days.
+        days (float): Duration in days (any real number, including NumPy
+            scalars and 0-d arrays).
         short (bool): If True, uses abbreviated units (d, mo, yr).
 
     Examples:
@@ -38,55 +58,107 @@ def format_duration(days, short=False):
         45.0 -> "1 month, 15 days" (short: "1 mo, 15 d")
         400.0 -> "1 year, 1 month" (short: "1 yr, 1 mo")
     """
-    if days < 30:
-        unit = "d" if short else "days"
-        return f"{days:.1f} {unit}"
+    # (a plain float is hashable for the cache, unlike a 0-d array)
+    return _format_duration_cached(float(days), bool(short))
 
-    # Approx constants
-    DAYS_PER_YEAR = 365.25
-    DAYS_PER_MONTH = 30.44
+# Optimization: Reports repeat the same (often integer) durations, so memoize
+@functools.lru_cache(maxsize=4096)
+def _format_duration_cached(days, short):
+    """format_duration on a float, memoized."""
+    # Optimization: Unit names come from a lookup table indexed by (count != 1)
+    tbl = _UNITS_SHORT if short else _UNITS
+
+    if days < 30:
+        return f"{days:.1f} {tbl[0][1]}"
 
     if days >= DAYS_PER_YEAR:
         years = int(days // DAYS_PER_YEAR)
-        remaining_days = days % DAYS_PER_YEAR
-        months = int(round(remaining_days / DAYS_PER_MONTH))
+        months = int(round((days % DAYS_PER_YEAR) / DAYS_PER_MONTH))
 
         # Handle case where rounding up months makes it 12
-        if months == 12:
-            years += 1
-            months = 0
+        years += months // 12
+        months %= 12
+        return _join_units(years, 2, months, 1, tbl)
 
-        if short:
-            y_str = "yr"
-            m_str = "mo"
-        else:
-            y_str = "year" if years == 1 else "years"
-            m_str = "month" if months == 1 else "months"
-
-        if months == 0:
-            return f"{years} {y_str}"
-        return f"{years} {y_str}, {months} {m_str}"
-
-    else:
-        # Months and days
-        months = int(days // DAYS_PER_MONTH)
-        remaining_days = int(round(days % DAYS_PER_MONTH))
-
-        # Handle rollover
-        if remaining_days >= 30: # Rough check to roll over to next month
-             months += 1
-             remaining_days = 0
-
-        if short:
-            m_str = "mo"
-            d_str = "d"
+    # Months and days
+    months = int(days // DAYS_PER_MONTH)
+    remaining_days = int(round(days % DAYS_PER_MONTH))
+
+    # Handle rollover (rough check to roll over to next month)
+    if remaining_days >= 30:
+        months += 1
+        remaining_days = 0
+    return _join_units(months, 1, remaining_days, 0, tbl)
+
+def format_durations(days, short=False):
+    """
+    Vectorized counterpart of format_duration for a whole array of durations.
+
+    The year/month/day decomposition runs as NumPy divmods over the array;
+    only the final string assembly remains per row.
+
+    Args:
+        days (array-like): Durations in days.
+        short (bool): If True, uses abbreviated units (d, mo, yr).
+
+    Returns:
+        list of str: One formatted duration per input element (flattened).
+
+    Raises:
+        ValueError: For NaN or +inf durations, as format_duration does.
+    """
+    days = np.asarray(days, dtype=float).ravel()
+    tbl = _UNITS_SHORT if short else _UNITS
+
+    # NaN and +inf have no year/month decomposition (format_duration raises
+    # on them too); they would otherwise come out as garbage integer counts
+    not_formattable = np.isnan(days) | (days == np.inf)
+    if not_formattable.any():
+        raise ValueError(f"Cannot format non-finite duration {days[not_formattable][0]}")
+
+    is_days = days < 30
+    is_years = days >= DAYS_PER_YEAR
+    # (short durations, -inf included, are printed as days and never decomposed)
+    span = np.where(is_days, 0.0, days)
+
+    years, rem_year = np.divmod(span, DAYS_PER_YEAR)
+    year_months = np.round(rem_year / DAYS_PER_MONTH).astype(np.int64)
+    years = years.astype(np.int64) + year_months // 12
+    year_months %= 12
+
+    months, rem_month = np.divmod(span, DAYS_PER_MONTH)
+    month_days = np.round(rem_month).astype(np.int64)
+    months = months.astype(np.int64)
+    rollover = month_days >= 30
+    months[rollover] += 1
+    month_days[rollover] = 0
+
+    out = []
+    for k in range(days.size):
+        if is_days[k]:
+            out.append(f"{days[k]:.1f} {tbl[0][1]}")
+        elif is_years[k]:
+            out.append(_join_units(int(years[k]), 2, int(year_months[k]), 1, tbl))
         else:
-            m_str = "month" if months == 1 else "months"
-            d_str = "day" if remaining_days == 1 else "days"
+            out.append(_join_units(int(months[k]), 1, int(month_days[k]), 0, tbl))
+    return out
 
-        if remaining_days == 0:
-            return f"{months} {m_str}"
-        return f"{months} {m_str}, {remaining_days} {d_str}"
+# Rating tables for bisect_left, which counts the bounds strictly below the value.
+# C3 uses "< 15" for Excellent but "<= 20"/"<= 30" above it, so the first bound
+# is nudged one ulp down to make exactly 15 count as Good.
+_C3_BOUNDS = (math.nextafter(15.0, -math.inf), 20.0, 30.0)
+_C3_RATINGS = (
+    (Style.GREEN, "(Excellent)"),
+    (Style.GREEN, "(Good)"),
+    (Style.YELLOW, "(Acceptable)"),
+    (Style.RED, "(High Energy)"),
+)
+_VINF_BOUNDS = (4.5, 6.0)
+_VINF_RATINGS = (
+    (Style.GREEN, "(Good)"),
+    (Style.YELLOW, "(Acceptable)"),
+    (Style.RED, "(High)"),
+)
 
 def get_c3_rating(value):
     """
@@ -98,14 +170,10 @@ def get_c3_rating(value):
         20-30: Acceptable (Yellow)
         > 30: High Energy (Red)
     """
-    if value < 15:
-        return Style.GREEN, "(Excellent)"
-    elif value <= 20:
-        return Style.GREEN, "(Good)"
-    elif value <= 30:
-        return Style.YELLOW, "(Acceptable)"
-    else:
-        return Style.RED, "(High Energy)"
+    # NaN fails every comparison; rate it High Energy as the if/elif ladder did
+    if value != value:
+        return _C3_RATINGS[-1]
+    return _C3_RATINGS[bisect_left(_C3_BOUNDS, value)]
 
 def get_c3_color(value):
     """
@@ -124,12 +192,12 @@ def get_vinf_rating(value):
         4.5 - 6.0: Acceptable (Yellow) - challenging
         > 6.0: High (Red) - very difficult propulsive capture
     """
-    if value <= 4.5:
-        return Style.GREEN, "(Good)"
-    elif value <= 6.0:
-        return Style.YELLOW, "(Acceptable)"
-    else:
-        return Style.RED, "(High)"
+    if value != value:
+        return _VINF_RATINGS[-1]
+    return _VINF_RATINGS[bisect_left(_VINF_BOUNDS, value)]
+
+# Optimization: stdout's TTY-ness does not change during a run, so query it once
+_IS_TTY = sys.stdout is not None and sys.stdout.isatty()
 
 class Spinner:
     """
@@ -140,18 +208,25 @@ class Spinner:
         with Spinner("Calculating..."):
             long_running_function()
     """
+    SPINNER_CHARS = '⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏'
+
     def __init__(self, message="Processing", delay=0.1):
         self.message = message
         self.delay = delay
-        self.stop_event = threading.Event()
-        self.thread = threading.Thread(target=self._spin)
+        # Optimization: Build the static part of every frame once
+        # (encoded for the console by _spin)
+        self._frames = [f"\r{c} {message}..." for c in self.SPINNER_CHARS]
+        # The spinner thread is only created on __enter__ for a TTY
+        self.stop_event = None
+        self.thread = None
         self.start_time = None
-        # Check if output is a TTY
-        self.is_tty = sys.stdout.isatty()
+        self.is_tty = _IS_TTY
 
     def __enter__(self):
         self.start_time = time.time()
         if self.is_tty:
+            self.stop_event = threading.Event()
+            self.thread = threading.Thread(target=self._spin, daemon=True)
             self.thread.start()
         else:
             # Fallback for non-TTY: just print the message
@@ -190,11 +265,36 @@ class Spinner:
         sys.stdout.flush()
 
     def _spin(self):
-        spinner_chars = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
+        # Optimization: Write pre-encoded frames straight to the binary buffer to skip
+        # the text codec; only the elapsed-time suffix is formatted per tick.
+        stream = getattr(sys.stdout, 'buffer', None)
+        encoding = getattr(sys.stdout, 'encoding', None)
+        if stream is None or not encoding:
+            # Text-only stream (e.g. notebooks, io.StringIO): write the text frames
+            stream = sys.stdout
+            frames = self._frames
+            suffix = " ({:.1f}s)".format
+        else:
+            # Flush pending text so it is not reordered behind the raw bytes
+            sys.stdout.flush()
+            # In the console's own encoding, as the text layer would write them
+            # (characters it cannot represent, e.g. the braille spinner on a
+            # legacy code page, become '?')
+            frames = [f.encode(encoding, errors='replace') for f in self._frames]
+            suffix = lambda elapsed: f" ({elapsed:.1f}s)".encode(encoding, errors='replace')
+
+        write = stream.write
+        flush = stream.flush
+        n_frames = len(frames)
         i = 0
-        while not self.stop_event.is_set():
+        # Optimization: Event.wait returns as soon as the spinner is stopped, so
+        # __exit__ no longer waits out the rest of a sleep(delay) tick
+        stop_wait = self.stop_event.wait
+        while True:
             elapsed = time.time() - self.start_time
-            sys.stdout.write(f"\r{spinner_chars[i]} {self.message}... ({elapsed:.1f}s)")
-            sys.stdout.flush()
-            time.sleep(self.delay)
-            i = (i + 1) % len(spinner_chars)
+            write(frames[i])
+            write(suffix(elapsed))
+            flush()
+            if stop_wait(self.delay):
+                break
+            i = (i + 1) % n_frames
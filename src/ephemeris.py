@@ -1,9 +1,206 @@
+import math
 import numpy as np
 
 # Gravitational Constant for Sun (km^3/s^2)
 MU_SUN = 1.32712440018e11
 
-def get_ephemeris(body_name, jd):
+# AU to km
+AU = 149597870.7
+
+# Reference J2000
+J2000 = 2451545.0
+
+# Precompute constants for the Markley Kepler starter
+PI_SQ = np.pi ** 2
+MARKLEY_DEN = 1.0 / (PI_SQ - 6.0)
+
+def _solve_kepler_sincos(M, e):
+    """
+    Markley solver returning (E, sin(E), cos(E)).
+
+    The trig pair evaluated for the correction step is rotated by the (tiny)
+    correction with the angle-addition formulas, so callers that need sin(E)
+    and cos(E) pay for a single transcendental pair in total.
+    """
+    # Wrap M into [-pi, pi]
+    M = np.remainder(M + np.pi, 2 * np.pi) - np.pi
+    abs_M = np.abs(M)
+    M_sq = M * M
+
+    # Cubic starter
+    alpha = (3 * PI_SQ + 1.6 * np.pi * (np.pi - abs_M) / (1 + e)) * MARKLEY_DEN
+    d = 3 * (1 - e) + alpha * e
+    q = 2 * alpha * d * (1 - e) - M_sq
+    r = 3 * alpha * d * (d - 1 + e) * M + M_sq * M
+    w = (np.abs(r) + np.sqrt(q * q * q + r * r)) ** (2.0 / 3.0)
+    E = (2 * r * w / (w * w + w * q + q * q) + M) / d
+
+    # Fifth-order correction (only one sin/cos pair needed)
+    sin_E = np.sin(E)
+    cos_E = np.cos(E)
+    e_sin = e * sin_E
+    e_cos = e * cos_E
+    f0 = E - e_sin - M
+    f1 = 1 - e_cos
+    f2 = e_sin
+    f3 = e_cos
+    f4 = -e_sin
+    d3 = -f0 / (f1 - 0.5 * f0 * f2 / f1)
+    d4 = -f0 / (f1 + 0.5 * d3 * f2 + d3 * d3 * f3 / 6)
+    d5 = -f0 / (f1 + 0.5 * d4 * f2 + d4 * d4 * f3 / 6 + d4 * d4 * d4 * f4 / 24)
+
+    # sin/cos of the corrected angle via angle addition (|d5| is tiny, so
+    # two Taylor terms of sin(d5)/cos(d5) are exact to machine precision)
+    d5_sq = d5 * d5
+    sin_d = d5 * (1 - d5_sq / 6)
+    cos_d = 1 - 0.5 * d5_sq
+
+    return E + d5, sin_E * cos_d + cos_E * sin_d, cos_E * cos_d - sin_E * sin_d
+
+def _solve_kepler_sincos_scalar(M, e):
+    """
+    Pure-Python float version of _solve_kepler_sincos for single epochs.
+
+    Uses the math module so scalar callers avoid NumPy ufunc dispatch on
+    every operation.
+    """
+    M = (M + math.pi) % (2 * math.pi) - math.pi
+    abs_M = abs(M)
+    M_sq = M * M
+
+    alpha = (3 * PI_SQ + 1.6 * math.pi * (math.pi - abs_M) / (1 + e)) * MARKLEY_DEN
+    d = 3 * (1 - e) + alpha * e
+    q = 2 * alpha * d * (1 - e) - M_sq
+    r = 3 * alpha * d * (d - 1 + e) * M + M_sq * M
+    w = (abs(r) + math.sqrt(q * q * q + r * r)) ** (2.0 / 3.0)
+    E = (2 * r * w / (w * w + w * q + q * q) + M) / d
+
+    sin_E = math.sin(E)
+    cos_E = math.cos(E)
+    e_sin = e * sin_E
+    e_cos = e * cos_E
+    f0 = E - e_sin - M
+    f1 = 1 - e_cos
+    d3 = -f0 / (f1 - 0.5 * f0 * e_sin / f1)
+    d4 = -f0 / (f1 + 0.5 * d3 * e_sin + d3 * d3 * e_cos / 6)
+    d5 = -f0 / (f1 + 0.5 * d4 * e_sin + d4 * d4 * e_cos / 6 - d4 * d4 * d4 * e_sin / 24)
+
+    d5_sq = d5 * d5
+    sin_d = d5 * (1 - d5_sq / 6)
+    cos_d = 1 - 0.5 * d5_sq
+
+    return E + d5, sin_E * cos_d + cos_E * sin_d, cos_E * cos_d - sin_E * sin_d
+
+def solve_kepler(M, e):
+    """
+    Solves Kepler's equation M = E - e sin(E) for the eccentric anomaly (Vectorized).
+
+    Uses Markley's (1995) non-iterative cubic starter followed by a single
+    fifth-order correction, giving machine precision for 0 <= e < 1 in one pass.
+
+    Args:
+        M (np.array or float): Mean anomaly (rad).
+        e (float): Eccentricity.
+
+    Returns:
+        E (np.array or float): Eccentric anomaly (rad), wrapped to [-pi, pi].
+    """
+    return _solve_kepler_sincos(M, e)[0]
+
+def _perifocal_rotation(O, i, w):
+    """
+    Perifocal-to-ecliptic rotation R3(O) @ R1(i) @ R3(w) (3-1-3 Euler angles).
+
+    Optimization: Expanded symbolically, so building it costs three sin/cos
+    pairs and no intermediate matrices or matmuls.
+    """
+    cO, sO = math.cos(O), math.sin(O)
+    ci, si = math.cos(i), math.sin(i)
+    cw, sw = math.cos(w), math.sin(w)
+    return np.array([
+        [cO * cw - sO * sw * ci, -cO * sw - sO * cw * ci, sO * si],
+        [sO * cw + cO * sw * ci, -sO * sw + cO * cw * ci, -cO * si],
+        [sw * si, cw * si, ci],
+    ])
+
+def _build_body_cache():
+    """
+    Converts the tabulated orbital elements to km/radians and precomputes
+    the perifocal-to-inertial rotation matrix for each body.
+    """
+    # Orbital elements (approximate, J2000)
+    # a (AU), e, i (deg), Omega (deg), w (deg), M0 (deg at J2000)
+    # Mean motion n (deg/day)
+    elements = {
+        'earth': {
+            'a': 1.00000011,
+            'e': 0.01671022,
+            'i': 0.00005,
+            'O': -11.26064,
+            'w': 102.94719,
+            'M0': 100.46435 - 102.94719 - (-11.26064), # Mean Longitude L = M + w + O
+            'n': 0.985609
+        },
+        'mars': {
+            'a': 1.52366231,
+            'e': 0.09341233,
+            'i': 1.85061,
+            'O': 49.57854,
+            'w': 336.04084 - 49.57854, # w = w_bar - O (tabulated as longitude of perihelion)
+            'M0': 19.412,
+            'n': 0.524039
+        }
+    }
+
+    cache = {}
+    for name, el in elements.items():
+        a_km = el['a'] * AU
+        i = np.radians(el['i'])
+        O = np.radians(el['O'])
+        w = np.radians(el['w'])
+
+        # r_ECI = R3(O) * R1(i) * R3(w) * r_peri
+        sqrt_1me2 = float(np.sqrt(1 - el['e']**2))
+        M_rot = _perifocal_rotation(O, i, w)
+
+        cache[name] = {
+            'a_km': a_km,
+            'e': el['e'],
+            'b_km': a_km * sqrt_1me2,
+            'sqrt_1me2': sqrt_1me2,
+            # Plain floats keep the scalar path free of NumPy scalar arithmetic
+            'sqrt_mu_a': float(np.sqrt(MU_SUN * a_km)),
+            'M0_rad': float(np.radians(el['M0'])),
+            'n_rad': float(np.radians(el['n'])),
+            'M_rot': M_rot,
+            # Python-float copy of the two live columns for the scalar path
+            'M_rot_xy': tuple(tuple(float(m) for m in row) for row in M_rot[:, :2]),
+        }
+    return cache
+
+# Optimization: Elements and rotation matrices are constant per body, so build them once at import
+_BODY_CACHE = _build_body_cache()
+
+def _lookup_body(body_name):
+    el = _BODY_CACHE.get(body_name)
+    if el is None:
+        raise ValueError(f"Unknown body: {body_name}")
+    return el
+
+def _rotate_state(M_rot, xv, yv, vxv, vyv, out_r=None, out_v=None):
+    """Rotates perifocal (x, y) position/velocity components to the ecliptic frame."""
+    # Optimization: The perifocal z-component is identically zero, so only the first
+    # two columns of M_rot contribute. Combining them with outer products skips the
+    # stacked (3, N) perifocal arrays and a third of the rotation FLOPs.
+    col_x = M_rot[:, 0]
+    col_y = M_rot[:, 1]
+    r_vec = np.multiply.outer(col_x, xv, out=out_r)
+    r_vec += np.multiply.outer(col_y, yv)
+    v_vec = np.multiply.outer(col_x, vxv, out=out_v)
+    v_vec += np.multiply.outer(col_y, vyv)
+    return r_vec, v_vec
+
+def get_ephemeris(body_name, jd, out_r=None, out_v=None):
     """
     Returns position and velocity of a body at a given Julian Date.
     Simplified analytical model assuming circular/elliptical orbits 
@@ -12,152 +209,120 @@ def get_ephemeris(body_name, jd):
     Args:
         body_name (str): 'earth', 'mars', etc.
         jd (float): Julian Date.
+        out_r (np.array, optional): Preallocated (3, ...) buffer for r_vec.
+        out_v (np.array, optional): Preallocated (3, ...) buffer for v_vec.
         
     Returns:
         r_vec (np.array): Position vector (km).
         v_vec (np.array): Velocity vector (km/s).
     """
-    
-    # Orbital elements (approximate, J2000)
-    # a (AU), e, i (deg), Omega (deg), w (deg), M0 (deg at J2000)
-    # Mean motion n (deg/day)
-    
-    # AU to km
-    AU = 149597870.7
-    
-    # Reference J2000
-    J2000 = 2451545.0
+    el = _lookup_body(body_name)
+
+    a = el['a_km']
+    e = el['e']
+
+    # Optimization: A single epoch runs on Python floats with the math module,
+    # skipping the per-operation NumPy dispatch that dominates scalar calls.
+    if np.ndim(jd) == 0:
+        jd = float(jd)
+        M = el['M0_rad'] + el['n_rad'] * (jd - J2000)
+        _, sin_E, cos_E = _solve_kepler_sincos_scalar(M, e)
+
+        xv = a * (cos_E - e)
+        yv = el['b_km'] * sin_E
+        v_factor = el['sqrt_mu_a'] / (a * (1 - e * cos_E))
+        vxv = -v_factor * sin_E
+        vyv = v_factor * el['sqrt_1me2'] * cos_E
+
+        (m00, m01), (m10, m11), (m20, m21) = el['M_rot_xy']
+        r_vec = np.empty(3) if out_r is None else out_r
+        v_vec = np.empty(3) if out_v is None else out_v
+        r_vec[:] = (m00 * xv + m01 * yv, m10 * xv + m11 * yv, m20 * xv + m21 * yv)
+        v_vec[:] = (m00 * vxv + m01 * vyv, m10 * vxv + m11 * vyv, m20 * vxv + m21 * vyv)
+        return r_vec, v_vec
+
+    # Use simple mean anomaly propagation
     d = jd - J2000
-    
-    elements = {}
-    
-    # Earth
-    elements['earth'] = {
-        'a': 1.00000011,
-        'e': 0.01671022,
-        'i': 0.00005,
-        'O': -11.26064,
-        'w': 102.94719,
-        'L': 100.46435, # Mean Longitude L = M + w + O
-        'n': 0.985609
-    }
-    
-    # Mars
-    elements['mars'] = {
-        'a': 1.52366231,
-        'e': 0.09341233,
-        'i': 1.85061,
-        'O': 49.57854,
-        'w': 336.04084, # longitude of perihelion (w_bar = w + O) -> w = w_bar - O
-        # Actually usually tabulated as L, w_bar, etc.
-        # Let's use simple Keplerian elements.
-        'M0': 19.412, # Mean anomaly at J2000?
-        'n': 0.524039
-    }
-    
-    if body_name == 'earth':
-        # Use simple mean anomaly propagation
-        el = elements['earth']
-        M = np.radians(el['L'] - el['w'] - el['O'] + el['n'] * d)
-        a = el['a'] * AU
-        e = el['e']
-        i = np.radians(el['i'])
-        O = np.radians(el['O'])
-        w = np.radians(el['w'])
-    elif body_name == 'mars':
-        el = elements['mars']
-        # M = M0 + n * d
-        M = np.radians(el['M0'] + el['n'] * d)
-        a = el['a'] * AU
-        e = el['e']
-        i = np.radians(el['i'])
-        O = np.radians(el['O'])
-        # w is argument of periapsis
-        # if w in dict is longitude of perihelion, w = w_bar - O
-        w_bar = 336.04084 
-        w = np.radians(w_bar - el['O'])
-    else:
-        raise ValueError(f"Unknown body: {body_name}")
-        
+    M = el['M0_rad'] + el['n_rad'] * d
+
     # Solve Kepler Equation M = E - e sin E
-    E = M
-    for _ in range(10):
-        E = M + e * np.sin(E)
-        
+    # Optimization: Markley's closed-form starter replaces the 10-step fixed-point loop.
+    # It also hands back sin(E)/cos(E), so the whole pipeline (Kepler solve,
+    # perifocal state, rotation) costs a single transcendental pair per JD.
+    _, sin_E, cos_E = _solve_kepler_sincos(M, e)
+
     # Perifocal coordinates
     # r = a(1 - e cos E)
     # x = a(cos E - e)
     # y = a sqrt(1-e^2) sin E
-    
-    r_mag = a * (1 - e * np.cos(E))
-    xv = a * (np.cos(E) - e)
-    yv = a * np.sqrt(1 - e**2) * np.sin(E)
-    
-    v_factor = np.sqrt(MU_SUN * a) / r_mag
-    vxv = -v_factor * np.sin(E)
-    vyv = v_factor * np.sqrt(1 - e**2) * np.cos(E)
-    
-    # Rotate to ECI (or ecliptic)
-    # P = [cos w cos O - sin w cos i sin O, -sin w cos O - cos w cos i sin O, sin i sin O] etc.
-    # It's easier to rotate vectors
-    
-    def rot_z(angle, vec):
-        c, s = np.cos(angle), np.sin(angle)
-        x, y, z = vec
-        return np.array([c*x - s*y, s*x + c*y, z])
-        
-    def rot_x(angle, vec):
-        c, s = np.cos(angle), np.sin(angle)
-        x, y, z = vec
-        return np.array([x, c*y - s*z, s*y + c*z])
-
-    # Perifocal vector
-    # Handle array broadcasting for z-component
-    zeros = np.zeros_like(xv)
-    r_peri = np.array([xv, yv, zeros])
-    v_peri = np.array([vxv, vyv, zeros])
-    
-    # 3-1-3 rotation? 
-    # Usually: rotate by -w around Z, then -i around X, then -O around Z to go FROM Inertial TO Perifocal
-    # So to go FROM Perifocal TO Inertial:
-    # Rotate by -w (which is w) around Z? No.
-    # r_ECI = Rz(-O) Rx(-i) Rz(-w) r_peri
-    # Actually standard rotation matrix:
-    # r_ECI = Rz(-Omega) * Rx(-i) * Rz(-omega) * r_peri (if using Euler angles as defined typically)
-    # Wait, usually P is Rz(Omega) Rx(i) Rz(omega)?
-    # Let's apply rotations manually in sequence:
-    # 1. Rotate by -w around Z? No, we are in perifocal, so orbit plane.
-    # First rotation is argument of periapsis w in the plane.
-    # Actually, Rz(-w) * r_peri puts X axis aligned with node line?
-    
-    # To get to inertial:
-    # 1. Rotate by -w around Z (aligns periapsis with node?) -> No.
-    # r_node = Rz(-w) r_peri ?
-    # Let's check: x_peri is towards periapsis.
-    # We want to rotate so x axis is the ascending node.
-    # The angle from node to periapsis is w. So we rotate by -w.
-    
-    # Actually, let's use the standard rotation matrix.
-    # R3_w = [[cw, -sw, 0], [sw, cw, 0], [0,0,1]]
-    # R1_i = [[1, 0, 0], [0, ci, -si], [0, si, ci]]
-    # R3_O = [[cO, -sO, 0], [sO, cO, 0], [0,0,1]]
-    
-    # r_ECI = R3_O * R1_i * R3_w * r_peri
-    
-    def R3(ang):
-        c, s = np.cos(ang), np.sin(ang)
-        return np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
-        
-    def R1(ang):
-        c, s = np.cos(ang), np.sin(ang)
-        return np.array([[1, 0, 0], [0, c, -s], [0, s, c]])
-        
-    M_rot = R3(O) @ R1(i) @ R3(w)
-    
-    r_vec = M_rot @ r_peri
-    v_vec = M_rot @ v_peri
-    
-    return r_vec, v_vec
+    # Optimization: Each quantity is built in place in a single temporary
+
+    xv = cos_E - e
+    xv *= a
+    yv = sin_E * el['b_km']
+
+    # v_factor = sqrt(mu a) / r
+    v_factor = cos_E * e
+    np.subtract(1, v_factor, out=v_factor)
+    v_factor *= a
+    np.divide(el['sqrt_mu_a'], v_factor, out=v_factor)
+
+    vxv = np.negative(v_factor)
+    vxv *= sin_E
+    vyv = v_factor * el['sqrt_1me2']
+    vyv *= cos_E
+
+    return _rotate_state(el['M_rot'], xv, yv, vxv, vyv, out_r=out_r, out_v=out_v)
+
+def get_ephemerides_batch(body_jds):
+    """
+    Returns positions and velocities for several bodies in one Kepler solve.
+
+    The mean anomalies of every request are concatenated and solved as a single
+    contiguous system, then split back and rotated with each body's cached matrix.
+    A body may appear more than once when passing a sequence of pairs.
+
+    Args:
+        body_jds (dict or list): {body_name: jd} or [(body_name, jd), ...].
+
+    Returns:
+        dict or list: (r_vec, v_vec) per request, keyed/ordered like the input,
+        with the same shapes get_ephemeris would return.
+    """
+    as_dict = isinstance(body_jds, dict)
+    items = list(body_jds.items()) if as_dict else list(body_jds)
+
+    els = [_lookup_body(name) for name, _ in items]
+    jds = [np.asarray(jd, dtype=float) for _, jd in items]
+    sizes = [jd.size for jd in jds]
+
+    def per_point(key):
+        return np.repeat([el[key] for el in els], sizes)
+
+    # Optimization: One Markley solve (and one set of temporaries) for all bodies
+    d = np.concatenate([jd.ravel() for jd in jds]) - J2000
+    M = per_point('M0_rad') + per_point('n_rad') * d
+    e = per_point('e')
+    a = per_point('a_km')
+    _, sin_E, cos_E = _solve_kepler_sincos(M, e)
+
+    xv = a * (cos_E - e)
+    yv = per_point('b_km') * sin_E
+    v_factor = per_point('sqrt_mu_a') / (a * (1 - e * cos_E))
+    vxv = -v_factor * sin_E
+    vyv = v_factor * per_point('sqrt_1me2') * cos_E
+
+    results = []
+    stop = 0
+    for el, jd, size in zip(els, jds, sizes):
+        sl = slice(stop, stop + size)
+        stop += size
+        r_vec, v_vec = _rotate_state(el['M_rot'], xv[sl], yv[sl], vxv[sl], vyv[sl])
+        results.append((r_vec.reshape((3,) + jd.shape), v_vec.reshape((3,) + jd.shape)))
+
+    if as_dict:
+        return {name: rv for (name, _), rv in zip(items, results)}
+    return results
 
 if __name__ == "__main__":
     # Test
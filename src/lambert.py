@@ -1,46 +1,164 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import warnings
 
 # Precompute constant
-SQRT2 = np.sqrt(2.0)
+# (Python floats, so float32 arrays are not promoted to float64 by NumPy 2 scalar rules)
+SQRT2 = math.sqrt(2.0)
 INV_3 = 1.0 / 3.0
 
+# Upper bound of z for elliptic transfers (sqrt(z)/2 = pi)
+Z_MAX = 4.0 * np.pi ** 2
+
+# Elements per block when lambert() tiles a large grid (see lambert)
+LAMBERT_BLOCK_SIZE = 16384
+
+# Below this many float64 elements, direct sin/cos beat the tan form (see _sin_cos)
+SINCOS_TAN_MIN_SIZE = 512
+
+# Scratch rows used by _compute_term_ratio / _compute_t_internal (see their `work`)
+WORK_ROWS = 5
+
+# Small-|z| (< 0.1) series, lowest order first:
+#   term  = -sqrt(2) * cos(sqrt(z)/2) = -sqrt(2) * (1 - z/8 + z^2/384 - z^3/46080 + z^4/10321920)
+#   ratio = sqrt(2)/3 * (1 + 3/40 z + 17/4480 z^2 + ...)
+TERM_SERIES = (1.0, -0.125, 0.00260416667, -2.17013889e-05, 9.68817756e-08)
+RATIO_SERIES = (1.0, 7.50000000e-02, 3.79464286e-03, 1.61830357e-04, 6.24091078e-06, 2.24778741e-07)
+# Their derivatives in z
+TERM_SERIES_D = tuple(k * c for k, c in enumerate(TERM_SERIES))[1:]
+RATIO_SERIES_D = tuple(k * c for k, c in enumerate(RATIO_SERIES))[1:]
+# The same coefficients unpacked to floats for the scalar kernel (_t_dtdz_scalar)
+_T0, _T1, _T2, _T3, _T4 = TERM_SERIES
+_R0, _R1, _R2, _R3, _R4, _R5 = RATIO_SERIES
+_DT0, _DT1, _DT2, _DT3 = TERM_SERIES_D
+_DR0, _DR1, _DR2, _DR3, _DR4 = RATIO_SERIES_D
+
+# Taylor series of the Stumpff functions for |z| < 1, lowest order first
+# (truncation error below 1e-18 there):
+#   C(z) = sum (-z)^k / (2k + 2)!,  S(z) = sum (-z)^k / (2k + 3)!
+STUMPFF_C_SERIES = tuple((-1) ** k / math.factorial(2 * k + 2) for k in range(9))
+STUMPFF_S_SERIES = tuple((-1) ** k / math.factorial(2 * k + 3) for k in range(9))
+
+def _horner(x, coeffs, scale, out=None):
+    """
+    Evaluates scale * sum(coeffs[k] * x**k) by Horner's rule.
+
+    Optimization: Every step runs in place in a single output array (one
+    allocation at most); np.polynomial.polynomial.polyval allocates a
+    temporary per coefficient and is ~2x slower here.
+    """
+    out = np.multiply(x, coeffs[-1], out=out)
+    out += coeffs[-2]
+    for c in coeffs[-3::-1]:
+        out *= x
+        out += c
+    out *= scale
+    return out
+
+def _float_dtype(a):
+    """Floating dtype to compute in for array a (float32 stays float32, ints become float64)."""
+    return np.result_type(a.dtype, np.float32)
+
+def _stumpff_c_s_scalar(z):
+    """
+    Stumpff C and S of one float with the math module (same regimes as stumpff_c_s).
+    """
+    if abs(z) < 1.0:
+        c = STUMPFF_C_SERIES[-1]
+        s = STUMPFF_S_SERIES[-1]
+        for cc, cs in zip(STUMPFF_C_SERIES[-2::-1], STUMPFF_S_SERIES[-2::-1]):
+            c = c * z + cc
+            s = s * z + cs
+        return c, s
+    if z > 0:
+        q = math.sqrt(z)
+        return (1.0 - math.cos(q)) / z, (q - math.sin(q)) / (z * q)
+    if z < 0:
+        q = math.sqrt(-z)
+        return (1.0 - math.cosh(q)) / z, (q - math.sinh(q)) / (z * q)
+    # NaN
+    return z, z
+
 def stumpff_c_s(z):
     """
     Vectorized Stumpff C and S functions computed together.
-    Returns (c, s).
+    Returns (c, s); floats for a scalar z.
     """
-    c = np.zeros_like(z, dtype=float)
-    s = np.zeros_like(z, dtype=float)
+    # Optimization: A scalar skips the ufunc dispatch and masks entirely
+    # (math.cos on a float is ~20x faster than np.cos on a 0-d array)
+    if np.ndim(z) == 0:
+        return _stumpff_c_s_scalar(float(z))
+
+    z = np.asarray(z)
 
     # Identify regimes
-    pos = z > 0
-    neg = z < 0
-    zero = z == 0
-
-    # Positive z
-    if np.any(pos):
-        z_pos = z[pos]
-        sqrt_z = np.sqrt(z_pos)
-        c[pos] = (1 - np.cos(sqrt_z)) / z_pos
-        # Optimization: Use multiplication instead of power for speed
-        s[pos] = (sqrt_z - np.sin(sqrt_z)) / (z_pos * sqrt_z)
-
-    # Negative z
-    if np.any(neg):
-        z_neg = z[neg]
-        sqrt_mz = np.sqrt(-z_neg)
-        c[neg] = (np.cosh(sqrt_mz) - 1) / (-z_neg)
-        # Optimization: Use multiplication (z_neg is negative, so -z_neg is positive squared mag)
-        s[neg] = (np.sinh(sqrt_mz) - sqrt_mz) / (-z_neg * sqrt_mz)
-
-    # Zero case
-    if np.any(zero):
-        c[zero] = 0.5
-        s[zero] = 1.0/6.0
+    # Optimization: |z| < 1 uses the Taylor series, which is cheaper than the
+    # transcendentals and free of the 1 - cos / sqrt - sin cancellation near 0
+    small = np.abs(z) < 1.0
+    if small.all():
+        zf = z.astype(float)
+        return _horner(zf, STUMPFF_C_SERIES, 1.0), _horner(zf, STUMPFF_S_SERIES, 1.0)
+
+    pos = z >= 1.0
+    neg = z <= -1.0
+
+    # Optimization: Evaluate over the whole contiguous array instead of gathering
+    # z[mask] and scattering the results back. cosh/sinh run unmasked (their
+    # SIMD loops are ~8x faster than the `where=` variants, so computing them
+    # for every entry is cheaper), then cos/sin overwrite the z > 0 entries.
+    # With q = sqrt(|z|) both signs then share one closed form:
+    #   C = (1 - cos q) / z = (1 - cosh q) / z,  S = (q - sin q) / (z q) = (q - sinh q) / (z q)
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        q = np.array(np.abs(z), dtype=float)
+        np.sqrt(q, out=q)
+        if not neg.any():
+            # No z < 0: trig only, unmasked as well
+            c = np.cos(q, out=np.empty_like(q))
+            s = np.sin(q, out=np.empty_like(q))
+        else:
+            c = np.cosh(q, out=np.empty_like(q))
+            s = np.sinh(q, out=np.empty_like(q))
+            if pos.any():
+                np.cos(q, where=pos, out=c)
+                np.sin(q, where=pos, out=s)
+        np.subtract(1.0, c, out=c)
+        np.divide(c, z, out=c)
+        np.subtract(q, s, out=s)
+        q *= z
+        np.divide(s, q, out=s)
+
+        # Small |z| (including z == 0)
+        if small.any():
+            zf = z.astype(float)
+            np.copyto(c, _horner(zf, STUMPFF_C_SERIES, 1.0), where=small)
+            np.copyto(s, _horner(zf, STUMPFF_S_SERIES, 1.0), where=small)
 
     return c, s
 
+def _sin_cos(x, sin_out=None, cos_out=None):
+    """
+    sin(x) and cos(x) for 0 <= x < pi.
+
+    NumPy has no sincos ufunc and its float64 sin/cos are several times slower
+    than tan, so large float64 arrays derive both from one t = tan(x/2):
+        sin(x) = 2t / (1 + t^2),  cos(x) = 2 / (1 + t^2) - 1
+    (absolute error stays within a few ulps, which is what term/ratio need).
+    cos_out may alias x.
+    """
+    if x.dtype != np.float64 or x.size < SINCOS_TAN_MIN_SIZE:
+        sa = np.sin(x, out=sin_out)
+        return sa, np.cos(x, out=cos_out)
+
+    h = np.multiply(x, 0.5, out=cos_out)
+    np.tan(h, out=h)
+    sa = np.multiply(h, 2.0, out=sin_out)
+    np.multiply(h, h, out=h)
+    np.add(h, 1.0, out=h)
+    np.divide(sa, h, out=sa)
+    np.divide(2.0, h, out=h)
+    np.subtract(h, 1.0, out=h)
+    return sa, h
+
 # Retain original functions for compatibility if needed, but implementation uses the combined one
 def stumpff_c(z):
     return stumpff_c_s(z)[0]
@@ -48,7 +166,7 @@ def stumpff_c(z):
 def stumpff_s(z):
     return stumpff_c_s(z)[1]
 
-def _compute_term_ratio(z, term_out=None, ratio_out=None):
+def _compute_term_ratio(z, term_out=None, ratio_out=None, return_small=False, work=None):
     """
     Computes auxiliary variables for Lambert solver using half-angle formulas.
     This avoids expensive Stumpff function calls and intermediate square roots.
@@ -63,20 +181,27 @@ def _compute_term_ratio(z, term_out=None, ratio_out=None):
 
         ratio: S(z) / C(z)^1.5
                Used to compute t.
+
+        small (only if return_small): which entries took the |z| < 0.1 series,
+               as False (none), True (all) or a boolean mask, so callers can
+               reuse the regime split instead of recomputing it.
+
+    work, if given, is a (WORK_ROWS, ...) scratch array shaped like z per row;
+    the intermediates live there instead of in per-call temporaries.
     """
     # Optimization: Use provided buffers to avoid allocation in hot loops
     if term_out is None:
-        term = np.empty_like(z, dtype=float)
+        term = np.empty_like(z, dtype=_float_dtype(z))
     else:
         term = term_out
 
     if ratio_out is None:
-        ratio = np.empty_like(z, dtype=float)
+        ratio = np.empty_like(z, dtype=_float_dtype(z))
     else:
         ratio = ratio_out
 
     if z.size == 0:
-        return term, ratio
+        return (term, ratio, False) if return_small else (term, ratio)
 
     # Optimization: Replaced min/max checks (2 data passes) with mask generation (1 pass per mask)
     # + boolean reduction (fast).
@@ -87,63 +212,66 @@ def _compute_term_ratio(z, term_out=None, ratio_out=None):
 
     # 1. All Large Positive
     if large_pos.all():
+        if work is None:
+            work = np.empty((3,) + z.shape, dtype=term.dtype)
         # z is guaranteed positive
-        zp = z
-        sz = np.sqrt(zp)
-        sz_2 = sz * 0.5
-        sa = np.sin(sz_2)
-        ca = np.cos(sz_2)
+        sz = np.sqrt(z, out=work[0])
+        sz_2 = np.multiply(sz, 0.5, out=work[1])
+        # Optimization: sin and cos share one tan evaluation
+        sa, ca = _sin_cos(sz_2, sin_out=work[2], cos_out=sz_2)
 
         # Term: -sqrt(2) * cos(sqrt(z)/2)
         np.multiply(ca, -SQRT2, out=term)
 
         # Ratio: (sz - 2*sa*ca) / (2*sqrt(2)*sa^3)
-        sa3 = sa * sa * sa
-
         # Calculate numerator in ratio buffer to save memory
         # num = sz - 2 * sa * ca
         np.multiply(sa, ca, out=ratio)
         np.multiply(ratio, -2.0, out=ratio)
         np.add(ratio, sz, out=ratio)
 
-        # Calculate denominator
-        den = 2 * SQRT2 * sa3
+        # Denominator 2*sqrt(2)*sa^3 (ca is no longer needed)
+        den = np.multiply(sa, sa, out=ca)
+        den *= sa
+        den *= 2 * SQRT2
 
         # Final division
         np.divide(ratio, den, out=ratio)
 
-        return term, ratio
+        return (term, ratio, False) if return_small else (term, ratio)
 
     large_neg = z <= -0.1
 
     # 2. All Large Negative
     if large_neg.all():
+        if work is None:
+            work = np.empty((3,) + z.shape, dtype=term.dtype)
         # z is guaranteed negative
-        zn = -z # Allocate temp array (unavoidable for sqrt(-z))
-        sz = np.sqrt(zn)
-        sz_2 = sz * 0.5
-        sa = np.sinh(sz_2)
-        ca = np.cosh(sz_2)
+        sz = np.negative(z, out=work[0])
+        np.sqrt(sz, out=sz)
+        sz_2 = np.multiply(sz, 0.5, out=work[1])
+        sa = np.sinh(sz_2, out=work[2])
+        ca = np.cosh(sz_2, out=sz_2)
 
         # Term: -sqrt(2) * cosh(sqrt(-z)/2)
         np.multiply(ca, -SQRT2, out=term)
 
         # Ratio: (2*sa*ca - sz) / (2*sqrt(2)*sa^3)
-        sa3 = sa * sa * sa
-
         # Calculate numerator in ratio buffer
         # num = 2 * sa * ca - sz
         np.multiply(sa, ca, out=ratio)
         np.multiply(ratio, 2.0, out=ratio)
         np.subtract(ratio, sz, out=ratio)
 
-        # Calculate denominator
-        den = 2 * SQRT2 * sa3
+        # Denominator 2*sqrt(2)*sa^3 (ca is no longer needed)
+        den = np.multiply(sa, sa, out=ca)
+        den *= sa
+        den *= 2 * SQRT2
 
         # Final division
         np.divide(ratio, den, out=ratio)
 
-        return term, ratio
+        return (term, ratio, False) if return_small else (term, ratio)
 
     # Check for presence of large values to determine if Pure Small
     has_pos = large_pos.any()
@@ -153,82 +281,46 @@ def _compute_term_ratio(z, term_out=None, ratio_out=None):
     if not has_pos and not has_neg:
         zs = z
 
-        # RATIO SERIES
-        # Optimization: Use ratio buffer for accumulation to save memory
-        # val_r = zs * 2.24778741e-07 + 6.24091078e-06
-        np.multiply(zs, 2.24778741e-07, out=ratio)
-        np.add(ratio, 6.24091078e-06, out=ratio)
-
-        # val_r = val_r * zs + 1.61830357e-04
-        np.multiply(ratio, zs, out=ratio)
-        np.add(ratio, 1.61830357e-04, out=ratio)
-
-        # val_r = val_r * zs + 3.79464286e-03
-        np.multiply(ratio, zs, out=ratio)
-        np.add(ratio, 3.79464286e-03, out=ratio)
-
-        # val_r = val_r * zs + 7.50000000e-02
-        np.multiply(ratio, zs, out=ratio)
-        np.add(ratio, 7.50000000e-02, out=ratio)
-
-        # val_r = val_r * zs + 1.0
-        np.multiply(ratio, zs, out=ratio)
-        np.add(ratio, 1.0, out=ratio)
-
-        # val_r *= (SQRT2 * INV_3)
-        np.multiply(ratio, (SQRT2 * INV_3), out=ratio)
+        # Optimization: Accumulate the series straight into the output buffers
+        _horner(zs, RATIO_SERIES, SQRT2 * INV_3, out=ratio)
+        _horner(zs, TERM_SERIES, -SQRT2, out=term)
 
-        # TERM SERIES
-        # Optimization: Use term buffer for accumulation
-        # val_t = zs * 9.68817756e-08 - 2.17013889e-05
-        np.multiply(zs, 9.68817756e-08, out=term)
-        np.subtract(term, 2.17013889e-05, out=term)
+        return (term, ratio, True) if return_small else (term, ratio)
 
-        # val_t = val_t * zs + 0.00260416667
-        np.multiply(term, zs, out=term)
-        np.add(term, 0.00260416667, out=term)
-
-        # val_t = val_t * zs - 0.125
-        np.multiply(term, zs, out=term)
-        np.subtract(term, 0.125, out=term)
-
-        # val_t = val_t * zs + 1.0
-        np.multiply(term, zs, out=term)
-        np.add(term, 1.0, out=term)
-
-        # val_t *= -SQRT2
-        np.multiply(term, -SQRT2, out=term)
-
-        return term, ratio
+    if work is None:
+        work = np.empty((WORK_ROWS,) + z.shape, dtype=term.dtype)
 
     # Mixed Regime (Masks reused)
-    if has_pos:
-        zp = z[large_pos]
-        sz = np.sqrt(zp)
-        sz_2 = sz * 0.5
-        sa = np.sin(sz_2)
-        ca = np.cos(sz_2)
-
-        # Term: -sqrt(2) * cos(sqrt(z)/2)
-        term[large_pos] = -SQRT2 * ca
-
-        # Ratio: (sz - 2*sa*ca) / (2*sqrt(2)*sa^3)
-        sa3 = sa * sa * sa
-        ratio[large_pos] = (sz - 2 * sa * ca) / (2 * SQRT2 * sa3)
-
-    if has_neg:
-        zn = -z[large_neg]
-        sz = np.sqrt(zn)
-        sz_2 = sz * 0.5
-        sa = np.sinh(sz_2)
-        ca = np.cosh(sz_2)
+    # Optimization: Evaluate both regimes' transcendentals densely over the whole
+    # array and pick per entry with np.where. Masked ufuncs (`where=`) fall off
+    # NumPy's SIMD loops and cost 5-8x a dense pass even for a multiply, while
+    # sinh/cosh and the shared-tan sin/cos are cheap enough to compute for every
+    # entry. Entries of the small regime hold garbage until the series
+    # overwrites them below.
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        sz = np.abs(z, out=work[0])
+        np.sqrt(sz, out=sz)
+        sz_2 = np.multiply(sz, 0.5, out=work[1])
+
+        sh = np.sinh(sz_2, out=work[2])
+        ch = np.cosh(sz_2, out=work[3])
+        sa, ca = _sin_cos(sz_2, sin_out=work[4], cos_out=sz_2)
+        sa = np.where(large_neg, sh, sa)
+        ca = np.where(large_neg, ch, ca)
+
+        # Term: -sqrt(2) * cos(sqrt(z)/2)  or  -sqrt(2) * cosh(sqrt(-z)/2)
+        np.multiply(ca, -SQRT2, out=term)
 
-        # Term: -sqrt(2) * cosh(sqrt(-z)/2)
-        term[large_neg] = -SQRT2 * ca
+        # Ratio: (sz - 2*sa*ca) / (2*sqrt(2)*sa^3), numerator negated for z < 0
+        np.multiply(sa, ca, out=ratio)
+        np.multiply(ratio, -2.0, out=ratio)
+        np.add(ratio, sz, out=ratio)
+        ratio *= np.sign(z, out=work[2])
 
-        # Ratio: (2*sa*ca - sz) / (2*sqrt(2)*sa^3)
-        sa3 = sa * sa * sa
-        ratio[large_neg] = (2 * sa * ca - sz) / (2 * SQRT2 * sa3)
+        sa3 = np.multiply(sa, sa, out=work[3])
+        sa3 *= sa
+        sa3 *= 2 * SQRT2
+        np.divide(ratio, sa3, out=ratio)
 
     # 3. Small Regime (|z| < 0.1)
     # Optimization: Reuse large_pos buffer to compute is_small to avoid allocations
@@ -240,71 +332,90 @@ def _compute_term_ratio(z, term_out=None, ratio_out=None):
     if np.any(is_small):
         zs = z[is_small]
 
-        # RATIO SERIES
-        # Ratio(z) = sqrt(2)/3 * (1 + 3/40 z + 17/4480 z^2 + ...)
-        # Coefficients: [1.0, 0.075, 0.00379464, 1.6183e-4, 6.2409e-6, 2.2477e-7]
-        # Optimization: Use in-place operations to minimize temporary allocations
-
-        # val_r = 2.24778741e-07 * zs + 6.24091078e-06
-        val_r = zs * 2.24778741e-07
-        val_r += 6.24091078e-06
-
-        # val_r = val_r * zs + 1.61830357e-04
-        val_r *= zs
-        val_r += 1.61830357e-04
-
-        # val_r = val_r * zs + 3.79464286e-03
-        val_r *= zs
-        val_r += 3.79464286e-03
-
-        # val_r = val_r * zs + 7.50000000e-02
-        val_r *= zs
-        val_r += 7.50000000e-02
-
-        # val_r = val_r * zs + 1.0
-        val_r *= zs
-        val_r += 1.0
+        # Series for ratio and term (see RATIO_SERIES / TERM_SERIES)
+        ratio[is_small] = _horner(zs, RATIO_SERIES, SQRT2 * INV_3)
+        term[is_small] = _horner(zs, TERM_SERIES, -SQRT2)
 
-        val_r *= (SQRT2 * INV_3) # In-place scaling
-        ratio[is_small] = val_r
+    return (term, ratio, is_small) if return_small else (term, ratio)
 
-        # TERM SERIES
-        # Term = -SQRT2 * cos(sqrt(z)/2)
-        # Using Taylor series for cos/cosh, same formula for pos/neg z.
-        # cos(x) = 1 - x^2/2 + x^4/24 - x^6/720 + x^8/40320
-        # x^2 = z/4
-        # Term / (-SQRT2) = 1 - z/8 + z^2/384 - z^3/46080 + z^4/10321920
-        # Coefficients: c0=1, c1=-0.125, c2=0.00260416667, c3=-2.17013889e-05, c4=9.68817756e-08
-
-        # val_t = 9.68817756e-08 * zs - 2.17013889e-05
-        val_t = zs * 9.68817756e-08
-        val_t -= 2.17013889e-05
-
-        # val_t = val_t * zs + 0.00260416667
-        val_t *= zs
-        val_t += 0.00260416667
-
-        # val_t = val_t * zs - 0.125
-        val_t *= zs
-        val_t -= 0.125
-
-        # val_t = val_t * zs + 1.0
-        val_t *= zs
-        val_t += 1.0
-
-        val_t *= -SQRT2
-        term[is_small] = val_t
+def _compute_term_ratio_deriv(z, term, ratio, small=None, d_term_out=None, d_ratio_out=None):
+    """
+    Analytic derivatives d(term)/dz and d(ratio)/dz for the Newton iteration.
+
+    Reuses the term/ratio values from _compute_term_ratio, so no extra
+    transcendental calls are needed:
+        q = sin(sqrt(z)/2) / sqrt(z) = sqrt((1 - term^2/2) / z)  [both signs of z]
+        d_term  = sqrt(2) * q / 4
+        d_ratio = (2 + 3 * term * ratio) / (4 * sqrt(2) * z * q)
+    Small |z| (< 0.1) uses the derivatives of the term/ratio series instead.
+
+    small is the regime split returned by _compute_term_ratio(return_small=True)
+    (False, True or a mask); it is recomputed from z when not given.
+    d_term_out/d_ratio_out are optional output buffers shaped like z.
+    """
+    if small is None:
+        small = np.abs(z) < 0.1
+
+    # Optimization: Pure regimes (the bulk of a porkchop grid) skip the masks
+    all_small = small is True or (small is not False and small.all())
+    any_small = small is True or (small is not False and small.any())
+
+    if not all_small:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            q = np.multiply(term, term, out=d_term_out)
+            q *= -0.5
+            q += 1.0
+            q /= z
+            np.sqrt(q, out=q)
+
+            d_ratio = np.multiply(term, ratio, out=d_ratio_out)
+            d_ratio *= 3.0
+            d_ratio += 2.0
+            d_ratio /= z
+            d_ratio /= q
+            d_ratio *= 1.0 / (4.0 * SQRT2)
+
+            d_term = q
+            d_term *= SQRT2 * 0.25
+    elif small is not True:
+        d_term = np.empty_like(z, dtype=_float_dtype(z)) if d_term_out is None else d_term_out
+        d_ratio = np.empty_like(z, dtype=_float_dtype(z)) if d_ratio_out is None else d_ratio_out
+
+    if any_small:
+        zs = z if small is True else z[small]
+
+        # d/dz of the term and ratio series
+        if small is True:
+            d_term = _horner(zs, TERM_SERIES_D, -SQRT2, out=d_term_out)
+            d_ratio = _horner(zs, RATIO_SERIES_D, SQRT2 * INV_3, out=d_ratio_out)
+        else:
+            d_term[small] = _horner(zs, TERM_SERIES_D, -SQRT2)
+            d_ratio[small] = _horner(zs, RATIO_SERIES_D, SQRT2 * INV_3)
 
-    return term, ratio
+    return d_term, d_ratio
 
-def _compute_t_internal(z_vals, r_sum, A, inv_sqrt_mu, term_out=None, ratio_out=None):
+def _compute_t_internal(z_vals, r_sum, A, inv_sqrt_mu, term_out=None, ratio_out=None, dtdz_out=None, work=None):
     """
     Internal helper to compute Time of Flight from z.
     Separated to support calculating on active subsets.
+
+    If dtdz_out is given, it is filled with the analytic derivative dt/dz
+    (NaN where y(z) <= 0).
+
+    work is an optional (WORK_ROWS, n) scratch array for the intermediates.
     """
     # Optimization: Use half-angle formulas to avoid stumpff_c_s and explicit sqrt(C)
     # Pass output buffers to avoid allocation
-    term, ratio = _compute_term_ratio(z_vals, term_out=term_out, ratio_out=ratio_out)
+    term, ratio, small = _compute_term_ratio(z_vals, term_out=term_out, ratio_out=ratio_out,
+                                             return_small=True, work=work)
+
+    if dtdz_out is not None:
+        # Optimization: Reuse the regime split instead of re-deriving |z| < 0.1
+        # (the derivatives take the scratch rows term/ratio no longer need)
+        if work is None:
+            d_term, d_ratio = _compute_term_ratio_deriv(z_vals, term, ratio, small)
+        else:
+            d_term, d_ratio = _compute_term_ratio_deriv(z_vals, term, ratio, small, work[0], work[1])
 
     # Optimization: Use in-place operations to avoid extra allocations
     # y_val = r_sum + A * term
@@ -318,84 +429,312 @@ def _compute_t_internal(z_vals, r_sum, A, inv_sqrt_mu, term_out=None, ratio_out=
     term += r_sum
     y_val = term
 
-    # Valid check
-    valid = y_val > 0
-
-    # Optimization: Fast path for common case (all valid)
+    # Optimization: y and sqrt(y) are shared by t and dt/dz instead of being
+    # rebuilt from term for the derivative
+    sqrt_y = None
+    if dtdz_out is not None:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sqrt_y = np.sqrt(y_val, out=None if work is None else work[2])
+
+            # dt/dz = [y' (1.5 sqrt(y) ratio + A / (2 sqrt(y))) + y^1.5 ratio'] / sqrt(mu)
+            # with y' = A * term'
+            np.multiply(sqrt_y, ratio, out=dtdz_out)
+            dtdz_out *= 1.5
+            half_a = np.divide(A, sqrt_y, out=None if work is None else work[3])
+            half_a *= 0.5
+            dtdz_out += half_a
+            d_term *= A
+            dtdz_out *= d_term
+            d_ratio *= y_val
+            d_ratio *= sqrt_y
+            dtdz_out += d_ratio
+            dtdz_out *= inv_sqrt_mu
+
+    # Optimization: t is evaluated densely for every lane, valid or not, and
+    # lanes with y <= 0 are only marked NaN afterwards. A few invalid lanes no
+    # longer cost gathering the valid ones into copies and scattering them back.
+    # (sqrt(y < 0) is already NaN; y == 0 is marked explicitly.)
     # Reusing the 'ratio' buffer avoids allocating 't_val' (large array) and reduces copying.
-    if valid.all():
-        # y_val is guaranteed positive, so we can use it directly
-        # ratio is available for in-place modification
+    with np.errstate(invalid='ignore'):
+        if sqrt_y is None:
+            sqrt_y = np.sqrt(y_val)
 
         # t = sqrt(y) * (y * ratio + A) / sqrt(mu)
-
-        sqrt_y = np.sqrt(y_val)
-
-        # ratio = y * ratio + A
         ratio *= y_val
         ratio += A
-
-        # ratio = ratio * sqrt(y) * inv_sqrt_mu
         ratio *= sqrt_y
         ratio *= inv_sqrt_mu
 
-        return ratio
+    invalid = y_val <= 0
+    if invalid.any():
+        ratio[invalid] = np.nan
+        if dtdz_out is not None:
+            dtdz_out[invalid] = np.nan
 
-    # Slow path (mixed valid/invalid)
+    return ratio
 
-    # Capture valid parts of ratio BEFORE potentially wiping buffer (if ratio_out is reused as t_val)
-    if np.any(valid):
-        rat_v = ratio[valid] # Copy
-        y_v = y_val[valid]
-    else:
-        rat_v = None
+def _initial_z(dt, r_sum, A, mu):
+    """
+    Starting z for the solver from Izzo's single-revolution initial guess.
 
-    # Reuse ratio_out buffer for t_val if possible, otherwise allocate
-    if ratio_out is not None:
-        t_val = ratio_out
-        t_val.fill(np.nan)
+    Izzo's variable x (cos(alpha/2) on ellipses) makes the non-dimensional
+    time of flight T(x) nearly a power law, so his closed-form x0 is usually
+    within a few percent of the root. It is mapped back to the universal
+    variable as z = 4 psi^2, where psi is half the change in eccentric anomaly:
+        cos(psi) = x y + lam (1 - x^2)   (cosh(psi) on hyperbolas, z < 0)
+    Ref: D. Izzo, "Revisiting Lambert's problem", CMDA 121 (2015).
+
+    Returns 0 (the parabolic guess) where the inputs give no finite guess.
+    """
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        # Semi-perimeter s = (r_sum + c) / 2, using c^2 = r_sum^2 - 2 A^2
+        s = r_sum * r_sum
+        lam = A * A
+        lam *= 2.0
+        s -= lam
+        np.maximum(s, 0.0, out=s)
+        np.sqrt(s, out=s)
+        s += r_sum
+        s *= 0.5
+
+        # lam = sqrt(r1 r2) cos(dnu/2) / s (signed by the transfer direction)
+        np.divide(A, s, out=lam)
+        lam *= 1.0 / SQRT2
+        lam2 = lam * lam
+
+        # T = dt * sqrt(2 mu / s^3)
+        T = np.sqrt(s)
+        T *= s
+        np.divide(dt, T, out=T)
+        T *= math.sqrt(2.0 * mu)
+
+        # Minimum-energy time T0 = acos(lam) + lam sqrt(1 - lam^2)
+        T0 = np.subtract(1.0, lam2, out=s)
+        np.sqrt(T0, out=T0)
+        T0 *= lam
+        T0 += np.arccos(lam)
+
+        # T >= T0: x0 = (T0 / T)^(2/3) - 1
+        x = np.divide(T0, T)
+        x *= x
+        np.cbrt(x, out=x)
+        x -= 1.0
+
+        short = T < T0
+        if short.any():
+            T_s = T[short]
+            T0_s = T0[short]
+            lam_s = lam[short]
+            # Parabolic time T1 = 2/3 (1 - lam^3)
+            T1 = lam_s * lam_s
+            T1 *= lam_s
+            np.subtract(1.0, T1, out=T1)
+            T1 *= 2.0 * INV_3
+
+            # T1 <= T < T0: x0 = 2^(log(T / T0) / log(T1 / T0)) - 1
+            x_s = np.log(T_s / T0_s)
+            x_s /= np.log(T1 / T0_s)
+            np.exp2(x_s, out=x_s)
+            x_s -= 1.0
+
+            # T < T1: x0 = 5/2 T1 (T1 - T) / (T (1 - lam^5)) + 1
+            fast = T_s < T1
+            if fast.any():
+                T1_f = T1[fast]
+                T_f = T_s[fast]
+                lam5 = lam_s[fast] ** 5
+                x_s[fast] = 2.5 * T1_f * (T1_f - T_f) / (T_f * (1.0 - lam5)) + 1.0
+            x[short] = x_s
+
+        # v = x y + lam (1 - x^2), with y = sqrt(1 - lam^2 (1 - x^2))
+        omx2 = x * x
+        np.subtract(1.0, omx2, out=omx2)
+        y = np.multiply(lam2, omx2, out=lam2)
+        np.subtract(1.0, y, out=y)
+        np.sqrt(y, out=y)
+        y *= x
+        v = np.multiply(lam, omx2, out=omx2)
+        v += y
+
+        # z = 4 (acos(v)^2 - acosh(v)^2): one of the two terms is zero
+        z = np.clip(v, -1.0, 1.0, out=x)
+        np.arccos(z, out=z)
+        z *= z
+        np.maximum(v, 1.0, out=v)
+        np.arccosh(v, out=v)
+        v *= v
+        z -= v
+        z *= 4.0
+
+    # Stay strictly below the elliptic singularity, where t(z) is unbounded
+    np.minimum(z, 0.999 * Z_MAX, out=z)
+    z[~np.isfinite(z)] = 0.0
+    return z
+
+def _initial_z_scalar(dt, r_sum, A, mu):
+    """Scalar (math module) counterpart of _initial_z."""
+    s = 0.5 * (r_sum + math.sqrt(max(0.0, r_sum * r_sum - 2.0 * A * A)))
+    lam = A / (SQRT2 * s)
+    T = dt * math.sqrt(2.0 * mu / (s * s * s))
+    T0 = math.acos(lam) + lam * math.sqrt(1.0 - lam * lam)
+    if T >= T0:
+        x = (T0 / T) ** (2.0 / 3.0) - 1.0
     else:
-        t_val = np.full_like(z_vals, np.nan)
-
-    if rat_v is not None:
-        # rat_v and y_v captured above
-
-        # For subset calculation, we need to slice A for valid entries too
-        if A.shape != ():  # Check if A is an array
-            # If A matches z_vals shape (broadcasted), we slice it.
-            # If A is scalar or (1,1), we don't.
-            # But here z_vals is likely a subset (active), so r_sum and A passed in
-            # must already be subsets matching z_vals shape.
-            # So we just slice with [valid].
-            A_v = A[valid]
+        T1 = 2.0 * INV_3 * (1.0 - lam * lam * lam)
+        if T >= T1:
+            x = 2.0 ** (math.log(T / T0) / math.log(T1 / T0)) - 1.0
         else:
-            A_v = A
+            x = 2.5 * T1 * (T1 - T) / (T * (1.0 - lam ** 5)) + 1.0
 
-        # t = sqrt(y) * (y * ratio + A) / sqrt(mu)
-        # Optimized with in-place ops:
-        # temp = y * ratio + A
-        # temp *= sqrt(y)
-        # temp *= inv_sqrt_mu
+    omx2 = 1.0 - x * x
+    v = x * math.sqrt(1.0 - lam * lam * omx2) + lam * omx2
+    if v <= 1.0:
+        z = 4.0 * math.acos(max(v, -1.0)) ** 2
+    else:
+        z = -4.0 * math.acosh(v) ** 2
+    z = min(z, 0.999 * Z_MAX)
+    return z if math.isfinite(z) else 0.0
 
-        sqrt_y = np.sqrt(y_v)
+def _t_dtdz_scalar(z, r_sum, A, inv_sqrt_mu):
+    """
+    Scalar (math module) counterpart of _compute_t_internal with dtdz_out.
 
-        # t_temp = y_v * rat_v + A_v
-        # Optimization: Reuse rat_v buffer for t_temp (rat_v is a copy due to slicing)
-        # rat_v *= y_v
-        # rat_v += A_v
-        # rat_v *= sqrt_y
-        # rat_v *= inv_sqrt_mu
+    Returns (term, t, dt/dz); t and dt/dz are NaN where y(z) <= 0.
+    """
+    if z >= 0.1:
+        sz = math.sqrt(z)
+        sa = math.sin(0.5 * sz)
+        ca = math.cos(0.5 * sz)
+        term = -SQRT2 * ca
+        ratio = (sz - 2 * sa * ca) / (2 * SQRT2 * sa * sa * sa)
+    elif z <= -0.1:
+        sz = math.sqrt(-z)
+        sa = math.sinh(0.5 * sz)
+        ca = math.cosh(0.5 * sz)
+        term = -SQRT2 * ca
+        ratio = (2 * sa * ca - sz) / (2 * SQRT2 * sa * sa * sa)
+    else:
+        # TERM_SERIES / RATIO_SERIES and their derivatives, by Horner's rule
+        term = -SQRT2 * ((((_T4 * z + _T3) * z + _T2) * z + _T1) * z + _T0)
+        ratio = (SQRT2 * INV_3) * (((((_R5 * z + _R4) * z + _R3) * z + _R2) * z + _R1) * z + _R0)
+        d_term = -SQRT2 * (((_DT3 * z + _DT2) * z + _DT1) * z + _DT0)
+        d_ratio = (SQRT2 * INV_3) * ((((_DR4 * z + _DR3) * z + _DR2) * z + _DR1) * z + _DR0)
+
+    if abs(z) >= 0.1:
+        # Same closed forms as _compute_term_ratio_deriv, with q = sa / sz directly
+        q = sa / sz
+        d_term = SQRT2 * 0.25 * q
+        d_ratio = (2 + 3 * term * ratio) / (4 * SQRT2 * z * q)
+
+    y = r_sum + A * term
+    if not y > 0:
+        return term, math.nan, math.nan
+
+    sqrt_y = math.sqrt(y)
+    t = sqrt_y * (y * ratio + A) * inv_sqrt_mu
+    dtdz = (A * d_term * (1.5 * sqrt_y * ratio + 0.5 * A / sqrt_y) + y * sqrt_y * d_ratio) * inv_sqrt_mu
+    return term, t, dtdz
+
+def _lambert_scalar(r1_vec, r2_vec, dt, mu, tm, tol, max_iter, out_v1=None, out_v2=None):
+    """
+    Solves a single Lambert problem on Python floats with the math module.
 
-        rat_v *= y_v
-        rat_v += A_v
-        rat_v *= sqrt_y
-        rat_v *= inv_sqrt_mu
+    Mirrors _lambert_block (same Newton iteration and safeguards) without any
+    per-operation NumPy dispatch, temporaries or masks. Returns None for
+    degenerate inputs (A == 0, dt <= 0 or a collapsed y), which are left to
+    _lambert_block.
+    """
+    x1, y1, z1 = (float(c) for c in r1_vec)
+    x2, y2, z2 = (float(c) for c in r2_vec)
+    dt = float(dt)
 
-        t_val[valid] = rat_v
+    r1 = math.sqrt(x1 * x1 + y1 * y1 + z1 * z1)
+    r2 = math.sqrt(x2 * x2 + y2 * y2 + z2 * z2)
+    A = math.sqrt(max(0.0, r1 * r2 + (x1 * x2 + y1 * y2 + z1 * z2)))
+    if tm != 1:
+        A *= tm
+    if A == 0 or not dt > 0:
+        return None
 
-    return t_val
+    r_sum = r1 + r2
+    inv_sqrt_mu = 1.0 / math.sqrt(mu)
+    # y = 0 boundary (see _lambert_block); only exists for A > 0
+    z_lo = -4.0 * math.acosh(max(1.0, r_sum / (SQRT2 * A))) ** 2 if A > 0 else -math.inf
+
+    z = _initial_z_scalar(dt, r_sum, A, mu)
+    lo, hi = -math.inf, Z_MAX
+    term, t, dtdz = _t_dtdz_scalar(z, r_sum, A, inv_sqrt_mu)
+    if t != t:
+        z = 0.0
+        term, t, dtdz = _t_dtdz_scalar(z, r_sum, A, inv_sqrt_mu)
+    for _ in range(max_iter):
+        if abs(t - dt) < tol or not abs(dtdz) > 0:
+            break
+        if t > dt:
+            hi = z
+        else:
+            lo = z
+
+        z_new = z - math.log(t / dt) * t / dtdz
+        if z_new >= hi:
+            z_new = 0.5 * (z + hi)
+        elif z_new <= lo:
+            z_new = 0.5 * (z + lo)
+        elif z_new <= z_lo:
+            z_new = z_lo + (z - z_lo) * (dt / t) ** 2
+
+        term_new, t_new, dtdz_new = _t_dtdz_scalar(z_new, r_sum, A, inv_sqrt_mu)
+        for _ in range(max_iter):
+            if t_new == t_new:
+                break
+            z_new = 0.5 * (z + z_new)
+            term_new, t_new, dtdz_new = _t_dtdz_scalar(z_new, r_sum, A, inv_sqrt_mu)
+
+        z, term, t, dtdz = z_new, term_new, t_new, dtdz_new
+
+    y = r_sum + A * term
+    g = A * math.sqrt(y) * inv_sqrt_mu if y > 0 else 0.0
+    if g == 0:
+        # Collapsed transfer (y underflowed): let the array path produce its inf/NaN
+        return None
+    f = 1.0 - y / r1
+    g_dot = 1.0 - y / r2
+
+    v1 = ((x2 - f * x1) / g, (y2 - f * y1) / g, (z2 - f * z1) / g)
+    v2 = ((g_dot * x2 - x1) / g, (g_dot * y2 - y1) / g, (g_dot * z2 - z1) / g)
+    if out_v1 is None:
+        return np.array(v1), np.array(v2)
+    out_v1[:] = v1
+    out_v2[:] = v2
+    return out_v1, out_v2
+
+def lambert_scalar(r1_vec, r2_vec, dt, mu, tm=1, tol=1e-5, max_iter=50):
+    """
+    Solves a single Lambert problem, skipping lambert()'s array handling.
+
+    Intended for optimizer loops calling one problem at a time: the inputs go
+    straight to the float kernel with no asarray/dtype/shape dispatch.
+    Degenerate cases fall back to lambert().
 
-def lambert(r1_vec, r2_vec, dt, mu, tm=1, tol=1e-5, max_iter=50):
+    Args:
+        r1_vec (sequence): Initial position vector (3 floats).
+        r2_vec (sequence): Final position vector (3 floats).
+        dt (float): Time of flight.
+        mu (float): Gravitational parameter.
+        tm (int): Transfer mode (+1 short way, -1 long way).
+        tol (float): Tolerance for convergence.
+        max_iter (int): Maximum iterations.
+
+    Returns:
+        tuple: (v1_vec, v2_vec) as float64 arrays of shape (3,).
+    """
+    result = _lambert_scalar(r1_vec, r2_vec, dt, mu, tm, tol, max_iter)
+    if result is None:
+        return lambert(np.asarray(r1_vec, dtype=float), np.asarray(r2_vec, dtype=float), dt, mu, tm, tol, max_iter)
+    return result
+
+def lambert(r1_vec, r2_vec, dt, mu, tm=1, tol=1e-5, max_iter=50, dtype=None, out_v1=None, out_v2=None,
+            workers=1):
     """
     Solves Lambert's problem using Universal Variables (Vectorized).
     
@@ -404,9 +743,26 @@ def lambert(r1_vec, r2_vec, dt, mu, tm=1, tol=1e-5, max_iter=50):
         r2_vec (np.array): Final position vector (..., 3).
         dt (np.array or float): Time of flight (seconds).
         mu (float): Gravitational parameter.
-        tm (int): Transfer mode (+1 short way, -1 long way).
+        tm (int or np.array): Transfer mode (+1 short way, -1 long way). An
+            array broadcasts against the batch shape like dt, so short- and
+            long-way solutions can be solved in one call (e.g. tm of shape
+            (2, 1, 1) over an (M, N) grid gives (2, M, N) results).
         tol (float): Tolerance for convergence.
         max_iter (int): Maximum iterations.
+        dtype (np.dtype, optional): Working precision of the iteration and dtype
+            of the returned velocities. np.float32 halves memory traffic for
+            plot-grade grids (~6 significant figures). The geometry (norms,
+            A) and the final f/g reconstruction stay in the inputs' precision,
+            so ill-conditioned near-180 degree transfers do not lose A to
+            float32 cancellation. By default the inputs' floating dtype is used.
+        out_v1 (np.array, optional): Preallocated (..., 3) buffer for v1_vec.
+        out_v2 (np.array, optional): Preallocated (..., 3) buffer for v2_vec.
+            Repeated callers (e.g. optimizer loops) can reuse them to avoid
+            allocating the results on every call. If only one is given, the
+            other result is allocated like it.
+        workers (int): Threads solving the row blocks of large batches (see
+            LAMBERT_BLOCK_SIZE) concurrently. Blocks are independent and NumPy
+            releases the GIL inside its loops, so this scales over cores.
                   
     Returns:
         v1_vec (np.array): Initial velocity vector (..., 3).
@@ -416,23 +772,116 @@ def lambert(r1_vec, r2_vec, dt, mu, tm=1, tol=1e-5, max_iter=50):
     r1_vec = np.asarray(r1_vec)
     r2_vec = np.asarray(r2_vec)
     dt = np.asarray(dt)
-    
+    tm_arr = np.asarray(tm)
+
+    # The paths below fill either both buffers or neither
+    if out_v1 is None and out_v2 is not None:
+        out_v1 = np.empty_like(out_v2)
+    elif out_v2 is None and out_v1 is not None:
+        out_v2 = np.empty_like(out_v1)
+
+    # Optimization: Mixed precision. Only the iteration state is held in the
+    # requested dtype; inputs keep their own precision for the geometry.
+    in_dtype = np.result_type(r1_vec.dtype, r2_vec.dtype, dt.dtype, np.float32)
+    ftype = in_dtype if dtype is None else np.dtype(dtype)
+
+    # Optimization: A single float64 problem runs on Python floats (_lambert_scalar),
+    # avoiding ~50 NumPy dispatches per iteration on 1-element arrays
+    if r1_vec.ndim == 1 and r2_vec.ndim == 1 and dt.size == 1 and tm_arr.ndim == 0 and ftype == np.float64:
+        result = _lambert_scalar(r1_vec, r2_vec, dt.item(), mu, tm, tol, max_iter, out_v1, out_v2)
+        if result is not None:
+            return result
+
     # Handle scalar inputs (single case) by promoting to 1-element arrays
-    was_scalar = False
-    if r1_vec.ndim == 1:
+    # (single vectors against an array dt take the broadcast path below)
+    if r1_vec.ndim == 1 and r2_vec.ndim == 1 and dt.size == 1 and tm_arr.ndim == 0:
         r1_vec = r1_vec[np.newaxis, :]
         r2_vec = r2_vec[np.newaxis, :]
         dt = np.atleast_1d(dt)
-        was_scalar = True
-    
+        v1_vec, v2_vec = _lambert_block(
+            r1_vec, r2_vec, dt, mu, tm, tol, max_iter, ftype,
+            None if out_v1 is None else out_v1[np.newaxis],
+            None if out_v2 is None else out_v2[np.newaxis])
+        if out_v1 is not None:
+            return out_v1, out_v2
+        return v1_vec[0].astype(ftype, copy=False), v2_vec[0].astype(ftype, copy=False)
+
+    # Optimization: Solve large grids in blocks of leading-axis rows.
+    # Every iteration re-reads the whole working set (z, t, A, r_sum, dt, masks),
+    # so keeping a block around LAMBERT_BLOCK_SIZE elements lets it stay in cache
+    # across iterations instead of streaming the full grid from DRAM each pass.
+    # (single vectors against an array dt or tm become a batch)
+    r1_vec = np.atleast_2d(r1_vec)
+    r2_vec = np.atleast_2d(r2_vec)
+    shape = np.broadcast_shapes(r1_vec.shape[:-1], r2_vec.shape[:-1], dt.shape, tm_arr.shape)
+    n_rows = shape[0]
+    row_size = int(np.prod(shape[1:]))
+    rows_per_block = max(1, LAMBERT_BLOCK_SIZE // max(row_size, 1))
+
+    if n_rows <= rows_per_block:
+        v1_vec, v2_vec = _lambert_block(r1_vec, r2_vec, dt, mu, tm, tol, max_iter, ftype, out_v1, out_v2)
+        if out_v1 is not None:
+            return out_v1, out_v2
+        return v1_vec.astype(ftype, copy=False), v2_vec.astype(ftype, copy=False)
+
+    # Left-pad every input to the full rank so axis 0 lines up
+    ndim = len(shape)
+    r1_vec = r1_vec.reshape((1,) * (ndim + 1 - r1_vec.ndim) + r1_vec.shape)
+    r2_vec = r2_vec.reshape((1,) * (ndim + 1 - r2_vec.ndim) + r2_vec.shape)
+    dt = dt.reshape((1,) * (ndim - dt.ndim) + dt.shape)
+    if tm_arr.ndim:
+        tm = tm_arr.reshape((1,) * (ndim - tm_arr.ndim) + tm_arr.shape)
+
+    v1_vec = np.empty(shape + (3,), dtype=ftype) if out_v1 is None else out_v1
+    v2_vec = np.empty(shape + (3,), dtype=ftype) if out_v2 is None else out_v2
+
+    def solve_rows(i0):
+        rows = slice(i0, i0 + rows_per_block)
+        # Each block writes its rows of the result in place
+        _lambert_block(
+            r1_vec if r1_vec.shape[0] == 1 else r1_vec[rows],
+            r2_vec if r2_vec.shape[0] == 1 else r2_vec[rows],
+            dt if dt.shape[0] == 1 else dt[rows],
+            mu, tm if tm_arr.ndim == 0 or tm.shape[0] == 1 else tm[rows], tol, max_iter, ftype,
+            v1_vec[rows], v2_vec[rows])
+
+    # Optimization: Blocks share no state and write disjoint rows, so they can
+    # be solved on a thread pool without locking; the ufuncs doing the work
+    # drop the GIL, leaving only the per-call Python overhead serialized
+    block_starts = range(0, n_rows, rows_per_block)
+    if workers > 1 and len(block_starts) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(block_starts))) as pool:
+            # (consuming the results re-raises any exception from a block)
+            for _ in pool.map(solve_rows, block_starts):
+                pass
+    else:
+        for i0 in block_starts:
+            solve_rows(i0)
+
+    return v1_vec, v2_vec
+
+def _lambert_block(r1_vec, r2_vec, dt, mu, tm, tol, max_iter, dtype=None, out_v1=None, out_v2=None):
+    """
+    Solves one broadcastable block of Lambert problems (inputs at least 1-D).
+    See lambert() for the argument conventions; dtype only sets the precision
+    of the iteration, the returned velocities follow the inputs (or out_v1/out_v2).
+    """
     # Magnitudes
-    # Optimization: Use einsum for faster squared norm calc than linalg.norm
-    r1 = np.sqrt(np.einsum('...k, ...k -> ...', r1_vec, r1_vec))
-    r2 = np.sqrt(np.einsum('...k, ...k -> ...', r2_vec, r2_vec))
+    # Optimization: Use einsum for faster squared norm calc than linalg.norm,
+    # taking the root in place on its result
+    r1 = np.einsum('...k, ...k -> ...', r1_vec, r1_vec)
+    np.sqrt(r1, out=r1)
+    r2 = np.einsum('...k, ...k -> ...', r2_vec, r2_vec)
+    np.sqrt(r2, out=r2)
     
     # Optimization: Use einsum to avoid allocating large intermediate array (M,N,3)
     # Replaces: dot_prod = np.sum(r1_vec * r2_vec, axis=-1)
-    dot_prod = np.einsum('...k, ...k -> ...', r1_vec, r2_vec)
+    # When the positions broadcast against each other (porkchop grids: launch
+    # (1, N, 3) x arrival (M, 1, 3)), optimize=True lets einsum run the dot
+    # products as one matrix product, ~6x faster than its elementwise loop.
+    # For same-shape inputs the plain loop is faster, so it is kept there.
+    n_dots = r1.size if r1.shape == r2.shape else int(np.prod(np.broadcast_shapes(r1.shape, r2.shape)))
+    dot_prod = np.einsum('...k, ...k -> ...', r1_vec, r2_vec, optimize=n_dots > max(r1.size, r2.size))
     
     # Optimization: reuse r1*r2 product
     r1r2 = r1 * r2
@@ -445,7 +894,11 @@ def lambert(r1_vec, r2_vec, dt, mu, tm=1, tol=1e-5, max_iter=50):
     np.maximum(0.0, r1r2, out=r1r2) # Safeguard against numerical noise
     np.sqrt(r1r2, out=r1r2)
 
-    if tm != 1:
+    if np.ndim(tm):
+        # Per-lane transfer modes broadcast A (and so the whole solve) over tm's
+        # axes, while the magnitudes and dot products above are shared by them
+        r1r2 = r1r2 * np.asarray(tm, dtype=r1r2.dtype)
+    elif tm != 1:
         r1r2 *= tm
 
     A = r1r2
@@ -454,128 +907,230 @@ def lambert(r1_vec, r2_vec, dt, mu, tm=1, tol=1e-5, max_iter=50):
     r_sum = r1 + r2
 
     # Optimization: Precompute inverse sqrt(mu) to use multiplication instead of division
-    inv_sqrt_mu = 1.0 / np.sqrt(mu)
+    # (as a Python float so it keeps the working dtype)
+    inv_sqrt_mu = 1.0 / math.sqrt(mu)
 
     # Solver state
-    # We solve for z.
-    # Initial guesses
-    z0 = np.zeros_like(dt, dtype=float)
-    z1 = np.ones_like(dt, dtype=float) # Guess z=1
-    
-    # Initialize Secant
-    # First iterations on full array
-    t0 = _compute_t_internal(z0, r_sum, A, inv_sqrt_mu)
-    t1 = _compute_t_internal(z1, r_sum, A, inv_sqrt_mu)
-
-    # Convergence mask (initially all False)
-    converged = np.zeros_like(dt, dtype=bool)
-
-    # Optimization: Preallocate diff buffer to avoid reallocation in loop
-    diff = np.empty_like(dt, dtype=float)
-
-    # Optimization: Preallocate buffers for term/ratio to avoid re-allocation in hot loop
+    # We solve for z with Newton steps on the analytic dt/dz, starting from
+    # Izzo's initial guess (see _initial_z).
+    # Optimization: t(z) is smooth and monotonic, so with an exact derivative
+    # this converges quadratically and needs far fewer evaluations than the
+    # secant it replaces.
+    shape = np.broadcast_shapes(dt.shape, A.shape)
+    dt = np.broadcast_to(dt, shape)
+    A = np.broadcast_to(A, shape)
+    r_sum = np.broadcast_to(r_sum, shape)
+
+    # Working precision follows the inputs (float32 grids stay float32) unless given
+    ftype = _float_dtype(A) if dtype is None else np.dtype(dtype)
+
+    # Optimization: Iterate on a packed working set. Flat copies of the
+    # per-problem state shrink as lanes converge (compacted with one boolean
+    # gather each), and converged z values are scattered out once by index.
+    # Per-iteration traffic is proportional to the active count, not the grid.
+    n_total = int(np.prod(shape))
+    dt_a = np.ascontiguousarray(dt, dtype=ftype).reshape(n_total)
+    A_a = np.ascontiguousarray(A, dtype=ftype).reshape(n_total)
+    r_sum_a = np.ascontiguousarray(r_sum, dtype=ftype).reshape(n_total)
+    if ftype != np.float64:
+        # tol is in seconds; below a few ulps of dt it cannot be met in reduced precision
+        tol = np.maximum(tol, 4 * np.finfo(ftype).eps * np.abs(dt_a))
+
+    # Optimization: Start from Izzo's initial guess instead of z = 0; it is
+    # close enough to the root to save several full-grid Newton evaluations
+    z = _initial_z(dt_a, r_sum_a, A_a, mu)
+
+    # Optimization: Preallocate buffers for term/ratio/dtdz to avoid re-allocation in hot loop
     # These are reused in _compute_t_internal
     # Allocate flat arrays to support slicing for active sets (which are flat)
-    term_buffer = np.empty(dt.size, dtype=float)
-    ratio_buffer = np.empty(dt.size, dtype=float)
+    term_buffer = np.empty(n_total, dtype=ftype)
+    ratio_buffer = np.empty(n_total, dtype=ftype)
+    dtdz_buffer = np.empty(n_total, dtype=ftype)
+    # Scratch rows for the intermediates of _compute_t_internal. Temporaries of
+    # a block's size are otherwise freed and re-faulted from the OS every call.
+    work_buffer = np.empty((WORK_ROWS, n_total), dtype=ftype)
+    keep_buffer = np.empty(n_total, dtype=bool)
+    slope_buffer = np.empty(n_total, dtype=bool)
+
+    # Optimization: Every t evaluation leaves y(z) = r_sum + A * term in the
+    # term buffer. When the iteration runs in the reconstruction precision,
+    # each lane's last y is kept and the f/g step below reuses it instead of
+    # evaluating term(z) over the whole block again.
+    # (A lower iteration precision recomputes y from the inputs for accuracy.)
+    reuse_y = ftype == np.result_type(A.dtype, r_sum.dtype)
+    y_full = np.empty(n_total, dtype=ftype) if reuse_y else None
+
+    dtdz_a = dtdz_buffer
+    t_a = _compute_t_internal(z, r_sum_a, A_a, inv_sqrt_mu, term_out=term_buffer,
+                              ratio_out=ratio_buffer, dtdz_out=dtdz_a, work=work_buffer)
+    y_a = term_buffer
+    bad = np.isnan(t_a)
+    if np.any(bad):
+        # Guess beyond the y = 0 boundary: restart those lanes from z = 0
+        z[bad] = 0.0
+        dtdz_b = np.empty(np.count_nonzero(bad), dtype=ftype)
+        y_b = np.empty_like(dtdz_b)
+        t_a[bad] = _compute_t_internal(z[bad], r_sum_a[bad], A_a[bad], inv_sqrt_mu,
+                                       term_out=y_b, dtdz_out=dtdz_b)
+        dtdz_a[bad] = dtdz_b
+        y_a[bad] = y_b
+
+    # Flat indices (into z) of the problems still iterating
+    active_idx = np.arange(n_total)
+    z_a = z
+
+    # Bracket [lo, hi] around the root. t(z) increases monotonically, so every
+    # iterate tightens one side; Newton steps leaving it fall back to bisection.
+    # hi starts at the elliptic singularity, lo is open until an iterate lands
+    # below the root (the y = 0 bound is applied lazily below).
+    lo_a = np.full(n_total, -np.inf, dtype=ftype)
+    hi_a = np.full(n_total, Z_MAX, dtype=ftype)
+
+    # The y = 0 boundary only exists for A > 0 (-inf elsewhere):
+    # r_sum = sqrt(2) * A * cosh(sqrt(-z_lo)/2)  =>  z_lo = -(2 acosh(r_sum / (sqrt(2) A)))^2
+    # Optimization: It depends only on the geometry, so it is evaluated once per
+    # lane here instead of masking and re-deriving it for z < 0 every iteration
+    has_lo = A_a > 0
+    z_lo_a = np.multiply(A_a, SQRT2)
+    np.divide(r_sum_a, z_lo_a, out=z_lo_a, where=has_lo)
+    np.maximum(z_lo_a, 1.0, out=z_lo_a)
+    np.arccosh(z_lo_a, out=z_lo_a)
+    z_lo_a *= z_lo_a
+    z_lo_a *= -4.0
+    np.copyto(z_lo_a, -np.inf, where=~has_lo)
 
     for _ in range(max_iter):
-        # diff = t1 - dt
-        np.subtract(t1, dt, out=diff)
-
-        # Check convergence
-        # Optimization: removed redundant not_nan check.
-        # np.abs(diff) < tol will be False if diff is NaN.
-        just_converged = (np.abs(diff) < tol)
-        converged |= just_converged
-
-        # Active set: Not converged
-        active = ~converged
-
-        if not np.any(active):
+        # Keep iterating where not converged
+        # (a zero or NaN slope cannot take a step)
+        # Optimization: The residual, its magnitude and the mask are written into
+        # scratch rows (free until the next t evaluation) instead of a fresh
+        # temporary per ufunc. A NaN residual compares False and retires the lane,
+        # as before, without materialising an isnan mask.
+        n_active = t_a.size
+        diff = np.subtract(t_a, dt_a, out=work_buffer[0, :n_active])
+        abs_buf = np.abs(diff, out=work_buffer[1, :n_active])
+        keep = np.greater_equal(abs_buf, tol, out=keep_buffer[:n_active])
+        np.abs(dtdz_a, out=abs_buf)
+        keep &= np.greater(abs_buf, 0, out=slope_buffer[:n_active])
+
+        # Optimization: One count answers both "all kept" and "all done", so the
+        # final iteration writes back without building and applying the masks
+        n_keep = np.count_nonzero(keep)
+        if n_keep == 0:
+            z[active_idx] = z_a
+            if reuse_y:
+                y_full[active_idx] = y_a
             break
+        if n_keep < keep.size:
+            done = ~keep
+            done_idx = active_idx[done]
+            z[done_idx] = z_a[done]
+            if reuse_y:
+                y_full[done_idx] = y_a[done]
+            active_idx = active_idx[keep]
+            z_a = z_a[keep]
+            t_a = t_a[keep]
+            dtdz_a = dtdz_a[keep]
+            diff = diff[keep]
+            lo_a = lo_a[keep]
+            hi_a = hi_a[keep]
+            z_lo_a = z_lo_a[keep]
+            dt_a = dt_a[keep]
+            A_a = A_a[keep]
+            r_sum_a = r_sum_a[keep]
+            if np.ndim(tol):
+                tol = tol[keep]
+
+        # Tighten the bracket with the current iterate
+        above = diff > 0
+        np.copyto(hi_a, z_a, where=above)
+        np.copyto(lo_a, z_a, where=~above)
+
+        # Newton step on ln t(z) - ln dt: t grows like a power of the distance to
+        # both ends of the z range, so the log is far closer to linear than t.
+        z_new_a = np.divide(t_a, dt_a)
+        np.log(z_new_a, out=z_new_a)
+        z_new_a *= t_a
+        z_new_a /= dtdz_a
+        np.subtract(z_a, z_new_a, out=z_new_a)
+
+        # Steps leaving the bracket bisect towards the crossed side instead
+        # (for hi this also keeps z below the elliptic singularity at 4*pi^2)
+        over = z_new_a >= hi_a
+        if np.any(over):
+            z_new_a[over] = 0.5 * (z_a[over] + hi_a[over])
+        over = z_new_a <= lo_a
+        if np.any(over):
+            z_new_a[over] = 0.5 * (z_a[over] + lo_a[over])
+
+        # Likewise keep z above the y = 0 boundary z_lo_a (precomputed above)
+        below = z_new_a <= z_lo_a
+        if np.any(below):
+            # Near the boundary t ~ sqrt(z - z_lo), so solve that local model
+            # instead: z = z_lo + (z_prev - z_lo) * (dt / t)^2, strictly above z_lo
+            z_lo_b = z_lo_a[below]
+            scale = dt_a[below] / t_a[below]
+            scale *= scale
+            z_new_a[below] = z_lo_b + (z_a[below] - z_lo_b) * scale
 
-        # Subsetting for active calculations
-        z0_a = z0[active]
-        z1_a = z1[active]
-        t0_a = t0[active]
-        t1_a = t1[active]
-        diff_a = diff[active]
-
-        denom_sec = t1_a - t0_a
-        denom_sec[denom_sec == 0] = 1e-12
-        
-        dz = -diff_a * (z1_a - z0_a) / denom_sec
-        z_new_a = z1_a + dz
-
-        # Update z1 for active
-        z0[active] = z1_a
-        t0[active] = t1_a
-        z1[active] = z_new_a
-        
-        # Compute t1 only for active
-        # Slice static arrays to match active subset
-        r_sum_a = r_sum[active]
-        A_a = A[active]
-        
         # Optimization: Use slices of preallocated buffers to avoid creating new arrays
-        # z_new_a size is equal to count of active
-        # We can just take the first n elements of the buffers
+        # (t_a/dtdz_a may already alias these slices; their old values are no longer needed)
         n_active = z_new_a.size
-        term_slice = term_buffer[:n_active]
-        ratio_slice = ratio_buffer[:n_active]
-
-        t_val_a = _compute_t_internal(z_new_a, r_sum_a, A_a, inv_sqrt_mu, term_out=term_slice, ratio_out=ratio_slice)
-        t1[active] = t_val_a
-        
-        # Recovery for NaNs in active set
-        nan_mask_sub = np.isnan(t_val_a)
-        if np.any(nan_mask_sub):
-            # If t1 becomes NaN, it means the guess z_new_a yielded invalid y (< 0).
-            # Standard recovery is to bisect or reset.
-            # Here we reset z1 to z0 (which was the previous valid step).
-            # z0[active] holds the previous z1.
-            # We must identify which indices in the full array correspond to these NaNs.
-            # Or simpler: we just update the 'z1' array values at these active+nan positions.
-
-            # Identify elements in 'z_new_a' that are bad
-            z0_rec = z0_a[nan_mask_sub] # Previous valid values
-
-            # We want to reset z1 to z0 for these bad points.
-            # Since we just updated z1[active] = z_new_a, we need to overwrite the bad ones.
-            # But we can't easily index into z1[active][nan_mask_sub] assignment-wise in one go
-            # if we didn't keep the index mapping.
-            # Actually we can:
-            # We need to write into z1.
-            # The indices in z1 are 'active' masked by 'nan_mask_sub'.
-            # It's tricky to construct a boolean mask for the full array from nested masks.
-            # Full mask = active AND (t1 is nan)
-
-            # Since we updated t1[active], we can check t1 again?
-            # t1 has been updated. The NaNs are there.
-            full_nan_mask = active & np.isnan(t1)
-
-            if np.any(full_nan_mask):
-                # Reset z1 to z0 for these points
-                z1[full_nan_mask] = z0[full_nan_mask]
-
-                # We also need to recompute t1 for these points (which is t0)
-                t1[full_nan_mask] = t0[full_nan_mask]
-
-    # Final z is z1
-    z = z1
+        dtdz_a = dtdz_buffer[:n_active]
+        t_a = _compute_t_internal(z_new_a, r_sum_a, A_a, inv_sqrt_mu,
+                                  term_out=term_buffer[:n_active],
+                                  ratio_out=ratio_buffer[:n_active],
+                                  dtdz_out=dtdz_a,
+                                  work=work_buffer[:, :n_active])
+        # (_compute_t_internal leaves y in the term buffer)
+        y_a = term_buffer[:n_active]
+
+        # Recovery if roundoff still lands a step in the y < 0 region (t is NaN
+        # there): halve the step back towards the previous, valid z.
+        # Optimization: Track the failing lanes by index so each retry only
+        # touches those lanes rather than rescanning the whole active set
+        bad = np.flatnonzero(np.isnan(t_a))
+        for _ in range(max_iter):
+            if bad.size == 0:
+                break
+            z_b = z_a[bad]
+            z_b += z_new_a[bad]
+            z_b *= 0.5
+            z_new_a[bad] = z_b
+            dtdz_b = np.empty(bad.size, dtype=ftype)
+            y_b = np.empty_like(dtdz_b)
+            t_b = _compute_t_internal(z_b, r_sum_a[bad], A_a[bad], inv_sqrt_mu,
+                                      term_out=y_b, dtdz_out=dtdz_b)
+            t_a[bad] = t_b
+            dtdz_a[bad] = dtdz_b
+            y_a[bad] = y_b
+            bad = bad[np.isnan(t_b)]
+
+        z_a = z_new_a
+    else:
+        # Lanes still active after max_iter keep their latest iterate
+        z[active_idx] = z_a
+        if reuse_y:
+            y_full[active_idx] = y_a
+
+    z = z.reshape(shape)
 
     # Compute v vectors
-    term, _ = _compute_term_ratio(z)
+    if reuse_y:
+        y = y_full.reshape(shape)
+    else:
+        term, _ = _compute_term_ratio(z)
 
-    # y = r1 + r2 + A * term
-    # Optimization: Reuse term buffer for y (as term is not used after this)
-    term *= A
-    term += r_sum
-    y = term
+        # y = r1 + r2 + A * term
+        # Optimization: Reuse term buffer for y (as term is not used after this),
+        # unless the iteration ran in lower precision than the geometry
+        y = np.multiply(term, A, out=term if term.dtype == A.dtype else None)
+        y += r_sum
     
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
+    # Optimization: np.errstate only swaps NumPy's thread-local error mode, unlike
+    # warnings.catch_warnings, which rebuilds the global (non-thread-safe) filter list
+    # (unconverged lanes may still produce inf/NaN here, which is intended)
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
 
         # Optimization: Reduce allocations for f, g, g_dot
         # g = A * sqrt(y) / sqrt(mu)
@@ -584,36 +1139,44 @@ def lambert(r1_vec, r2_vec, dt, mu, tm=1, tol=1e-5, max_iter=50):
         g *= A
 
         # f = 1 - y / r1
-        f = 1.0 - y / r1
+        f = np.divide(y, r1)
+        np.subtract(1.0, f, out=f)
 
         # g_dot = 1 - y / r2
-        g_dot = 1.0 - y / r2
-
-        # Broadcasting g to (..., 1)
-        g_exp = np.expand_dims(g, axis=-1)
-        f_exp = np.expand_dims(f, axis=-1)
-        g_dot_exp = np.expand_dims(g_dot, axis=-1)
-
-        # Optimization: Use in-place operations to minimize temporary allocations
-        # v1_vec = (r2_vec - f_exp * r1_vec) / g_exp
-
-        # v1_vec = r1_vec * f_exp
-        v1_vec = np.multiply(r1_vec, f_exp)
-        # v1_vec = r2_vec - v1_vec
-        np.subtract(r2_vec, v1_vec, out=v1_vec)
-        # v1_vec /= g_exp
-        np.divide(v1_vec, g_exp, out=v1_vec)
-
-        # v2_vec = (g_dot_exp * r2_vec - r1_vec) / g_exp
-
-        # v2_vec = r2_vec * g_dot_exp
-        v2_vec = np.multiply(r2_vec, g_dot_exp)
-        # v2_vec -= r1_vec
-        np.subtract(v2_vec, r1_vec, out=v2_vec)
-        # v2_vec /= g_exp
-        np.divide(v2_vec, g_exp, out=v2_vec)
-    
-    if was_scalar:
-        return v1_vec[0], v2_vec[0]
-    else:
-        return v1_vec, v2_vec
+        g_dot = np.divide(y, r2)
+        np.subtract(1.0, g_dot, out=g_dot)
+
+        # Optimization: Use in-place operations to minimize temporary allocations,
+        # building the velocities directly in caller buffers when they have the
+        # reconstruction dtype (a lower-precision buffer is filled by a final cast)
+        vtype = np.result_type(r1_vec.dtype, r2_vec.dtype, y.dtype)
+        v1_vec = out_v1 if out_v1 is not None and out_v1.dtype == vtype else np.empty(g.shape + (3,), dtype=vtype)
+        v2_vec = out_v2 if out_v2 is not None and out_v2.dtype == vtype else np.empty(g.shape + (3,), dtype=vtype)
+
+        # Optimization: Build the velocities one component at a time. Broadcasting
+        # f, g_dot and g over a trailing axis of length 3 runs every ufunc as a
+        # 3-element inner loop per problem; per component, each op is one long
+        # loop over the grid (~1.6x faster, same operations and rounding).
+        tmp = np.empty(g.shape, dtype=vtype)
+        for k in range(3):
+            x1 = r1_vec[..., k]
+            x2 = r2_vec[..., k]
+
+            # v1 = (r2 - f * r1) / g
+            np.multiply(x1, f, out=tmp)
+            np.subtract(x2, tmp, out=tmp)
+            np.divide(tmp, g, out=v1_vec[..., k])
+
+            # v2 = (g_dot * r2 - r1) / g
+            np.multiply(x2, g_dot, out=tmp)
+            np.subtract(tmp, x1, out=tmp)
+            np.divide(tmp, g, out=v2_vec[..., k])
+
+    if out_v1 is not None and v1_vec is not out_v1:
+        np.copyto(out_v1, v1_vec, casting='same_kind')
+        v1_vec = out_v1
+    if out_v2 is not None and v2_vec is not out_v2:
+        np.copyto(out_v2, v2_vec, casting='same_kind')
+        v2_vec = out_v2
+
+    return v1_vec, v2_vec
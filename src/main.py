@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 import numpy as np
-from plotter import generate_porkchop, plot_porkchop, jd_from_date
+from plotter import generate_porkchop, plot_porkchop
 from porkchop_mesh import DataGrid, PorkchopMesh
 from mesh_exporter import write_vtp
 from pathlib import Path
@@ -36,7 +36,8 @@ def main():
     total_traj = len(launch_dates) * len(arrival_dates)
     
     with Spinner(f"Computing {total_traj:,} trajectories"):
-        ld, ad, C3, Vinf, TOF = generate_porkchop(launch_dates, arrival_dates, 'earth', 'mars', verbose=False)
+        ld, ad, C3, Vinf, TOF, launch_jds, arrival_jds = generate_porkchop(
+            launch_dates, arrival_dates, 'earth', 'mars', verbose=False, return_jds=True)
 
     # Find and display the optimal transfer (lowest C3)
     optimal_transfer = None
@@ -84,9 +85,9 @@ def main():
             plot_porkchop(ld, ad, C3, TOF, filename='astrochop.png', optimal_transfer=optimal_transfer, title=plot_title)
 
             # --- New Mesh Generation Logic ---
-            # Convert dates to floats (JDs) for the axes
-            x_axis = np.array([jd_from_date(d) for d in ld])
-            y_axis = np.array([jd_from_date(d) for d in ad])
+            # Dates as floats (JDs) for the axes, as already converted by generate_porkchop
+            x_axis = launch_jds
+            y_axis = arrival_jds
 
             # Create DataGrid using C3 energy
             grid = DataGrid(C3, x_axis, y_axis)
@@ -105,7 +106,8 @@ def main():
             grid.x_axis -= x_mean
             grid.y_axis -= y_mean
 
-            mesh.generate_mesh(z_scale=50.0, morph_type='linear')
+            # The axes are centred, so float32 vertices (what the VTP stores) lose nothing
+            mesh.generate_mesh(z_scale=50.0, morph_type='linear', dtype=np.float32)
 
             # Export
             write_vtp('earth_mars_porkchop.vtp', mesh)
@@ -1,14 +1,93 @@
 import numpy as np
 import os
 import errno
+import base64
+import zlib
 
-def write_vtp(filename, mesh):
+# Bytes per base64-encoded piece when streaming binary arrays (a multiple of 3,
+# so the pieces concatenate into one valid base64 stream without padding)
+_B64_CHUNK = 3 * (1 << 20)
+
+def _write_binary_array(f, arr, dtype):
+    """
+    Writes arr as the inline base64 payload of a VTK XML binary DataArray.
+
+    The payload is the little-endian UInt32 byte count followed by the raw
+    data, encoded as one base64 stream. It is encoded in chunks straight from
+    the array's buffer so no full-size text copy is ever built.
+    """
+    data = memoryview(np.ascontiguousarray(arr, dtype=dtype)).cast('B')
+    header = np.array(data.nbytes, dtype='<u4').tobytes()
+    f.write('          ')
+    f.write(base64.b64encode(header + data[:_B64_CHUNK - len(header)]).decode('ascii'))
+    for i in range(_B64_CHUNK - len(header), data.nbytes, _B64_CHUNK):
+        f.write(base64.b64encode(data[i:i + _B64_CHUNK]).decode('ascii'))
+    f.write('\n')
+
+# Uncompressed bytes per zlib block of compressed appended data (VTK's default)
+_ZLIB_BLOCK = 1 << 15
+
+def _appended_pieces(arr, dtype, compress):
+    """
+    Returns the byte buffers of one array's entry in a raw AppendedData block.
+
+    Uncompressed, that is the UInt32 byte count and the array's own buffer.
+    Compressed (vtkZLibDataCompressor), it is the UInt32 block header
+    [n_blocks, block size, last block size, compressed sizes...] followed by
+    the zlib-compressed blocks.
+    """
+    data = memoryview(np.ascontiguousarray(arr, dtype=dtype)).cast('B')
+    if not compress:
+        return [np.array(data.nbytes, dtype='<u4').tobytes(), data]
+    # Level 1: float/int mesh data compresses no better at higher levels, 5-8x slower
+    blocks = [zlib.compress(data[i:i + _ZLIB_BLOCK], 1) for i in range(0, data.nbytes, _ZLIB_BLOCK)]
+    last = data.nbytes - (len(blocks) - 1) * _ZLIB_BLOCK if blocks else 0
+    header = np.array([len(blocks), _ZLIB_BLOCK, last] + [len(b) for b in blocks], dtype='<u4')
+    return [header.tobytes()] + blocks
+
+# Bytes buffered by write_vtp between write() syscalls
+_WRITE_BUFFER = 1 << 20
+
+# Rows formatted per write() when streaming ASCII arrays. Small enough that
+# each chunk's values and text stay cache-resident (~60 KB of text per chunk);
+# the file buffer still batches them into large write() syscalls.
+_ASCII_CHUNK_ROWS = 1 << 11
+
+def _write_ascii_array(f, arr, fmt):
+    """
+    Writes arr as ASCII text, one row per line (same output as np.savetxt).
+
+    Optimization: np.savetxt formats one row per Python-level `%` call; here
+    a whole chunk of rows is formatted by a single `%` on a repeated row
+    template (3-6x faster), while chunking keeps the text buffer bounded.
+    """
+    arr = np.asarray(arr)
+    if arr.ndim == 1:
+        arr = arr[:, np.newaxis]
+    row_fmt = ' '.join([fmt] * arr.shape[1]) + '\n'
+    for i in range(0, arr.shape[0], _ASCII_CHUNK_ROWS):
+        chunk = arr[i:i + _ASCII_CHUNK_ROWS]
+        f.write((row_fmt * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+def write_vtp(filename, mesh, binary=True, appended=True, compress=False, quantize_uvs=False):
     """
     Writes the PorkchopMesh to a VTK XML PolyData (.vtp) file.
 
     Args:
         filename (str): Output filename (should end in .vtp).
         mesh (PorkchopMesh): The mesh object to export.
+        binary (bool): Store the arrays in binary (default), which skips
+            float-to-text formatting and is several times smaller.
+            False writes human-readable ASCII.
+        appended (bool): With binary, store all arrays as raw bytes in one
+            AppendedData block after the XML (default). This is VTK's fastest
+            layout to write and read. False stores them inline as base64,
+            which keeps the file plain text at ~4/3 the size.
+        compress (bool): With appended, zlib-compress the arrays (typically
+            2-4x smaller for porkchop meshes, at some extra write time).
+        quantize_uvs (bool): Store NormalizedUV as UInt16 (uv * 65535, rounded)
+            instead of Float32, halving its size. The 1/65535 step is far
+            below colour-map resolution, but readers see 0-65535, not 0-1.
 
     Raises:
         ValueError: If mesh is not generated or filename has path traversal attempt.
@@ -35,6 +114,40 @@ def write_vtp(filename, mesh):
     n_points = len(mesh.vertices)
     n_polys = len(mesh.indices)
 
+    # Optimization: Binary arrays are written straight from the NumPy buffers
+    # (Float32/Int32, as declared) instead of formatting every value as text
+    offsets = np.arange(3, n_polys * 3 + 1, 3, dtype=np.int32)
+
+    if quantize_uvs:
+        # Q16 fixed point: the UVs are normalized to [0, 1]
+        uv_array = ('UInt16', 'NormalizedUV', None,
+                    np.rint(np.clip(mesh.uvs, 0.0, 1.0) * 65535.0).astype('<u2'), '<u2', '%d')
+    else:
+        uv_array = ('Float32', 'NormalizedUV', None, mesh.uvs, '<f4', '%.6f')
+
+    # (section, section attributes, [(VTK type, name, components, data, dtype, ASCII format)])
+    sections = [
+        ('Points', '', [('Float32', 'Points', 3, mesh.vertices, '<f4', '%.6f')]),
+        ('Polys', '', [('Int32', 'connectivity', None, mesh.indices, '<i4', '%d'),
+                       ('Int32', 'offsets', None, offsets, '<i4', '%d')]),
+        ('PointData', ' Scalars="MorphedValue"',
+         [('Float32', 'MorphedValue', None, mesh.scalars, '<f4', '%.6f'),
+          uv_array]),
+    ]
+
+    if binary and appended:
+        # Optimization: Raw appended data is the arrays' own bytes. Each one is
+        # converted once, its offset into the AppendedData block is known up
+        # front, and the block is a single run of (UInt32 size, buffer) writes.
+        payloads = [_appended_pieces(array[3], array[4], compress)
+                    for _, _, arrays in sections for array in arrays]
+        # (every piece is bytes or a byte-cast memoryview, so len() is its size)
+        payload_sizes = [sum(len(piece) for piece in pieces) for pieces in payloads]
+        payload_offsets = iter(np.cumsum([0] + payload_sizes[:-1]).tolist())
+        fmt = 'appended'
+    else:
+        fmt = 'binary' if binary else 'ascii'
+
     # Use os.open with O_NOFOLLOW to prevent symlink attacks (TOCTOU)
     # O_TRUNC to overwrite if exists, O_CREAT to create if not exists
     flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
@@ -51,45 +164,43 @@ def write_vtp(filename, mesh):
             raise ValueError(f"Security Error: File path '{filename}' is a symbolic link.")
         raise
 
-    with os.fdopen(fd, 'w') as f:
+    # Optimization: A 1 MiB write buffer (the default is 8 KiB) turns the many
+    # small header and chunk writes into a few large write() syscalls
+    with os.fdopen(fd, 'w', buffering=_WRITE_BUFFER, encoding='ascii') as f:
         f.write('<?xml version="1.0"?>\n')
-        f.write('<VTKFile type="PolyData" version="0.1" byte_order="LittleEndian">\n')
+        compressor = ' compressor="vtkZLibDataCompressor"' if fmt == 'appended' and compress else ''
+        f.write(f'<VTKFile type="PolyData" version="0.1" byte_order="LittleEndian"{compressor}>\n')
         f.write('  <PolyData>\n')
         f.write(f'    <Piece NumberOfPoints="{n_points}" NumberOfPolys="{n_polys}">\n')
 
-        # Points
-        f.write('      <Points>\n')
-        f.write('        <DataArray type="Float32" Name="Points" NumberOfComponents="3" format="ascii">\n')
-        # Optimized: Use np.savetxt to stream data instead of creating large string
-        # This drastically reduces memory usage for large meshes (e.g. 25M points)
-        # Time tradeoff is acceptable for stability.
-        np.savetxt(f, mesh.vertices, fmt='%.6f', delimiter=' ')
-        f.write('        </DataArray>\n')
-        f.write('      </Points>\n')
-
-        # Polys
-        f.write('      <Polys>\n')
-        f.write('        <DataArray type="Int32" Name="connectivity" format="ascii">\n')
-        # Optimized: Write indices directly. VTP supports newline separation.
-        np.savetxt(f, mesh.indices, fmt='%d', delimiter=' ')
-        f.write('        </DataArray>\n')
-        f.write('        <DataArray type="Int32" Name="offsets" format="ascii">\n')
-
-        offsets = np.arange(3, n_polys * 3 + 1, 3)
-        np.savetxt(f, offsets, fmt='%d') # Defaults to newline delimiter
-        f.write('        </DataArray>\n')
-        f.write('      </Polys>\n')
-
-        # Point Data
-        f.write('      <PointData Scalars="MorphedValue">\n')
-        f.write('        <DataArray type="Float32" Name="MorphedValue" format="ascii">\n')
-        np.savetxt(f, mesh.scalars, fmt='%.6f')
-        f.write('        </DataArray>\n')
-        f.write('        <DataArray type="Float32" Name="NormalizedUV" format="ascii">\n')
-        np.savetxt(f, mesh.uvs, fmt='%.6f')
-        f.write('        </DataArray>\n')
-        f.write('      </PointData>\n')
+        for section, section_attrs, arrays in sections:
+            f.write(f'      <{section}{section_attrs}>\n')
+            for vtk_type, name, n_components, data, dtype, ascii_fmt in arrays:
+                attrs = f'type="{vtk_type}" Name="{name}"'
+                if n_components is not None:
+                    attrs += f' NumberOfComponents="{n_components}"'
+                if fmt == 'appended':
+                    f.write(f'        <DataArray {attrs} format="appended" offset="{next(payload_offsets)}"/>\n')
+                    continue
+                f.write(f'        <DataArray {attrs} format="{fmt}">\n')
+                if binary:
+                    _write_binary_array(f, data, dtype)
+                else:
+                    # Optimized: Stream data in chunks instead of creating large string
+                    # This drastically reduces memory usage for large meshes (e.g. 25M points)
+                    _write_ascii_array(f, data, ascii_fmt)
+                f.write('        </DataArray>\n')
+            f.write(f'      </{section}>\n')
 
         f.write('    </Piece>\n')
         f.write('  </PolyData>\n')
+        if fmt == 'appended':
+            # The raw block starts right after the '_' marker; offsets count from there
+            f.write('  <AppendedData encoding="raw">\n   _')
+            f.flush()
+            for pieces in payloads:
+                for piece in pieces:
+                    f.buffer.write(piece)
+            f.buffer.flush()
+            f.write('\n  </AppendedData>\n')
         f.write('</VTKFile>\n')
@@ -5,11 +5,14 @@ import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
 from datetime import datetime, timedelta
 from lambert import lambert
-from ephemeris import get_ephemeris, MU_SUN
+from ephemeris import get_ephemerides_batch, MU_SUN
 from cli_utils import get_c3_rating, get_vinf_rating, format_duration
 
 MAX_GRID_SIZE = 4_000_000  # Protection against Memory Exhaustion (DoS) - Reduced to ~600MB peak usage
 
+# Most grid samples per axis that plot_porkchop contours (the axes span ~600 px)
+PLOT_MAX_SAMPLES = 1000
+
 def jd_from_date(date):
     """
     Converts datetime object to Julian Date.
@@ -29,6 +32,36 @@ def jd_from_date(date):
           
     return JDN + (h - 12) / 24.0
 
+def jds_from_dates(dates):
+    """
+    Converts a sequence of datetime objects to Julian Dates (same values as
+    jd_from_date).
+
+    Optimization: Only the date fields are read per date (one np.fromiter
+    each); the day-number arithmetic runs once over int64 arrays instead of
+    once per date in Python.
+
+    Args:
+        dates (list of datetime): Dates to convert.
+
+    Returns:
+        np.array: Julian Dates, float64 of shape (len(dates),).
+    """
+    n = len(dates)
+    Y = np.fromiter((d.year for d in dates), np.int64, n)
+    M = np.fromiter((d.month for d in dates), np.int64, n)
+    D = np.fromiter((d.day for d in dates), np.int64, n)
+    seconds = np.fromiter((d.hour * 3600 + d.minute * 60 + d.second for d in dates), np.int64, n)
+
+    # (NumPy's integer // floors like Python's, so this matches jd_from_date)
+    MM = (M - 14) // 12
+    JDN = (1461 * (Y + 4800 + MM)) // 4 + \
+          (367 * (M - 2 - 12 * MM)) // 12 - \
+          (3 * ((Y + 4900 + MM) // 100)) // 4 + \
+          D - 32075
+
+    return JDN + (seconds / 3600 - 12) / 24.0
+
 def date_from_jd(jd):
     """
     Converts Julian Date to datetime object.
@@ -64,7 +97,8 @@ def date_from_jd(jd):
     
     return datetime(year, month, int(day), h, m, int(s))
 
-def generate_porkchop(launch_dates, arrival_dates, body1='earth', body2='mars', verbose=False):
+def generate_porkchop(launch_dates, arrival_dates, body1='earth', body2='mars', verbose=False, dtype=None,
+                      workers=1, return_jds=False):
     """
     Generates data for porkchop plot.
     
@@ -74,12 +108,21 @@ def generate_porkchop(launch_dates, arrival_dates, body1='earth', body2='mars',
         body1 (str): Departure body.
         body2 (str): Arrival body.
         verbose (bool): Whether to show a progress bar.
+        dtype (np.dtype, optional): Working precision of the Lambert solve.
+            np.float32 is plenty for contour plots (C3 to ~1e-5 relative) and
+            roughly halves the solve time; defaults to float64.
+        workers (int): Threads for the Lambert solve of large grids (see lambert).
+        return_jds (bool): Also return the launch and arrival Julian Dates
+            computed for the ephemerides, so callers need not convert the
+            date lists again.
         
     Returns:
-        X (np.array): Launch dates (JDs).
-        Y (np.array): Arrival dates (JDs).
+        launch_dates (list of datetime): Launch dates, as given.
+        arrival_dates (list of datetime): Arrival dates, as given.
         C3 (np.array): Characteristic energy (km^2/s^2).
+        Vinf_arr (np.array): Arrival V_inf (km/s).
         TOF (np.array): Time of Flight (days).
+        launch_jds, arrival_jds (np.array): Only with return_jds, the dates as JDs.
     """
     n_launch = len(launch_dates)
     n_arrival = len(arrival_dates)
@@ -88,26 +131,21 @@ def generate_porkchop(launch_dates, arrival_dates, body1='earth', body2='mars',
     if n_launch * n_arrival > MAX_GRID_SIZE:
         raise ValueError(f"Grid size {n_launch}x{n_arrival} ({n_launch*n_arrival:,}) exceeds maximum limit of {MAX_GRID_SIZE:,}. Try increasing the step size (dt) to reduce the grid resolution.")
 
-    C3 = np.zeros((n_arrival, n_launch))
-    Vinf_arr = np.zeros((n_arrival, n_launch))
-    TOF = np.zeros((n_arrival, n_launch))
-    
-    # Pre-calculate positions to save time?
-    # Or just loop. Loop is easier to write.
-    
     # Vectorized implementation
+    # (C3, Vinf_arr and TOF are produced whole below, so nothing is preallocated)
     if verbose:
         print("Calculating vectorized solution...")
 
     # Vectorized ephemeris retrieval
-    jd1_arr = np.array([jd_from_date(ld) for ld in launch_dates])
-    r1_cols, v1_cols = get_ephemeris(body1, jd1_arr)
-    # get_ephemeris returns (3, N), we want (N, 3)
+    jd1_arr = jds_from_dates(launch_dates)
+    jd2_arr = jds_from_dates(arrival_dates)
+    # Optimization: Both bodies share a single Kepler solve
+    (r1_cols, v1_cols), (r2_cols, v2_cols) = get_ephemerides_batch(
+        [(body1, jd1_arr), (body2, jd2_arr)])
+    # Ephemerides are (3, N), we want (N, 3)
     r1_arr = r1_cols.T
     v1_arr = v1_cols.T
 
-    jd2_arr = np.array([jd_from_date(ad) for ad in arrival_dates])
-    r2_cols, v2_cols = get_ephemeris(body2, jd2_arr)
     r2_arr = r2_cols.T
     v2_arr = v2_cols.T
 
@@ -124,24 +162,38 @@ def generate_porkchop(launch_dates, arrival_dates, body1='earth', body2='mars',
 
     # Time of Flight matrix (M, N)
     dt_days = jd2_grid - jd1_grid
-    valid_mask = dt_days > 0
-
-    # Prepare inputs for Lambert
-    # We replace invalid dt with a dummy value (1.0) to avoid errors, then mask result
-    dt_sec = dt_days * 86400.0
-    dt_sec_safe = np.where(valid_mask, dt_sec, 1.0)
+    # Cells whose arrival is not after launch have no transfer
+    invalid_mask = dt_days <= 0
+    any_invalid = invalid_mask.any()
 
     # Solve Lambert (vectorized)
-    # r1_grid (1, N, 3) broadcasts with r2_grid (M, 1, 3) -> (M, N, 3)
-    # dt_sec_safe (M, N)
     # Note: lambert() handles broadcasting automatically
-    v1_trans, v2_trans = lambert(r1_grid, r2_grid, dt_sec_safe, MU_SUN)
+    if any_invalid:
+        # Optimization: Solve only the valid cells, packed into a flat batch,
+        # instead of the whole grid with dummy times for the invalid part
+        # (often a triangle covering a large share of the grid)
+        valid_mask = ~invalid_mask
+        arr_idx, dep_idx = np.nonzero(valid_mask)
+        # (boolean masks gather/scatter in the same row-major order as nonzero,
+        # but faster than the paired index arrays)
+        dt_sec = dt_days[valid_mask]
+        dt_sec *= 86400.0
+        v1_trans, v2_trans = lambert(r1_arr[dep_idx], r2_arr[arr_idx], dt_sec, MU_SUN,
+                                     dtype=dtype, workers=workers)
+        v1_body = v1_arr[dep_idx]
+        v2_body = v2_arr[arr_idx]
+    else:
+        # r1_grid (1, N, 3) broadcasts with r2_grid (M, 1, 3) -> (M, N, 3)
+        v1_trans, v2_trans = lambert(r1_grid, r2_grid, dt_days * 86400.0, MU_SUN,
+                                     dtype=dtype, workers=workers)
+        v1_body = v1_grid
+        v2_body = v2_grid
 
     # Calculate C3 and Vinf
     # v1_trans (M, N, 3) - v1_grid (1, N, 3) -> (M, N, 3)
     # Optimization: Reuse v1_trans buffer for dv1 to avoid allocating large intermediate array
     dv1 = v1_trans
-    dv1 -= v1_grid
+    dv1 -= v1_body
 
     # Optimization: Use einsum to compute squared norm directly, avoiding sqrt() and intermediate array
     # C3 = |v_inf_dep|^2
@@ -150,28 +202,40 @@ def generate_porkchop(launch_dates, arrival_dates, body1='earth', body2='mars',
     # v2_trans (M, N, 3) - v2_grid (M, 1, 3) -> (M, N, 3)
     # Optimization: Reuse v2_trans buffer for dv2 to avoid allocating large intermediate array
     dv2 = v2_trans
-    dv2 -= v2_grid
+    dv2 -= v2_body
 
     # Optimization: Use einsum then sqrt, which is faster than linalg.norm
-    Vinf_arr = np.sqrt(np.einsum('...k,...k->...', dv2, dv2))
+    # (the root is taken in place on the einsum result)
+    Vinf_arr = np.einsum('...k,...k->...', dv2, dv2)
+    np.sqrt(Vinf_arr, out=Vinf_arr)
 
     TOF = dt_days
 
-    # Apply mask to invalidate cases where dt <= 0
-    # Also mask any NaNs that might have come from Lambert (non-convergence)
-    C3[~valid_mask] = np.nan
-    Vinf_arr[~valid_mask] = np.nan
-    TOF[~valid_mask] = np.nan
-
+    if any_invalid:
+        # Scatter the packed results; cells where dt <= 0 stay NaN
+        # (NaNs from Lambert non-convergence pass through either way)
+        C3_grid = np.full(dt_days.shape, np.nan, dtype=C3.dtype)
+        C3_grid[valid_mask] = C3
+        C3 = C3_grid
+        Vinf_grid = np.full(dt_days.shape, np.nan, dtype=Vinf_arr.dtype)
+        Vinf_grid[valid_mask] = Vinf_arr
+        Vinf_arr = Vinf_grid
+        np.putmask(TOF, invalid_mask, np.nan)
+
+    if return_jds:
+        return launch_dates, arrival_dates, C3, Vinf_arr, TOF, jd1_arr, jd2_arr
     return launch_dates, arrival_dates, C3, Vinf_arr, TOF
 
+def _plot_indices(n):
+    """
+    Samples of an axis of length n that plot_porkchop contours: all of them,
+    or PLOT_MAX_SAMPLES evenly spaced ones including both ends.
+    """
+    if n <= PLOT_MAX_SAMPLES:
+        return slice(None)
+    return np.linspace(0, n - 1, PLOT_MAX_SAMPLES).round().astype(np.intp)
+
 def plot_porkchop(launch_dates, arrival_dates, C3, TOF, filename='astrochop.png', optimal_transfer=None, title='Earth-Mars Porkchop Plot'):
-    X, Y = np.meshgrid([jd_from_date(d) for d in launch_dates], [jd_from_date(d) for d in arrival_dates])
-    
-    # Convert dates for axis labels
-    x_dates = launch_dates
-    y_dates = arrival_dates
-    
     fig, ax = plt.subplots(figsize=(10, 8))
     
     # Contour levels for C3
@@ -179,17 +243,28 @@ def plot_porkchop(launch_dates, arrival_dates, C3, TOF, filename='astrochop.png'
     
     import matplotlib.dates as mdates
     
-    # We need to replot using date numbers
-    X_dates = mdates.date2num(np.meshgrid(launch_dates, arrival_dates)[0])
-    Y_dates = mdates.date2num(np.meshgrid(launch_dates, arrival_dates)[1])
+    # Optimization: contour accepts 1-D axes, so each date list is converted
+    # once instead of as two full meshgrids of datetime objects
+    # (and the contours are drawn once, directly on date numbers)
+    X_dates = mdates.date2num(launch_dates)
+    Y_dates = mdates.date2num(arrival_dates)
+
+    # Optimization: Contour at most PLOT_MAX_SAMPLES per axis. Finer grids only
+    # add sub-pixel detail, while contouring and drawing cost grows with cells.
+    x_idx = _plot_indices(len(X_dates))
+    y_idx = _plot_indices(len(Y_dates))
+    X_plot = X_dates[x_idx]
+    Y_plot = Y_dates[y_idx]
+    C3_plot = np.asarray(C3)[y_idx][:, x_idx]
+    TOF_plot = np.asarray(TOF)[y_idx][:, x_idx]
     
     # Filled contours for C3
-    CSF = ax.contourf(X_dates, Y_dates, C3, levels=levels, cmap='viridis')
+    CSF = ax.contourf(X_plot, Y_plot, C3_plot, levels=levels, cmap='viridis')
     cbar = fig.colorbar(CSF, ax=ax)
     cbar.set_label('$C_3$ (km$^2$/s$^2$)')
 
     # Line contours for C3 (thin, white/dark for contrast)
-    CS = ax.contour(X_dates, Y_dates, C3, levels=levels, colors='white', linewidths=0.5, alpha=0.5)
+    CS = ax.contour(X_plot, Y_plot, C3_plot, levels=levels, colors='white', linewidths=0.5, alpha=0.5)
     clabels = ax.clabel(CS, inline=1, fontsize=10, fmt='%1.1f')
 
     # Palette UX: Add black outline to C3 labels to ensure readability on high-energy (yellow) regions
@@ -214,7 +289,7 @@ def plot_porkchop(launch_dates, arrival_dates, C3, TOF, filename='astrochop.png'
     else:
         levels_tof = range(100, 1000, 50) # Fallback
 
-    CS2 = ax.contour(X_dates, Y_dates, TOF, levels=levels_tof, colors='magenta', linestyles='dashed', linewidths=1.0)
+    CS2 = ax.contour(X_plot, Y_plot, TOF_plot, levels=levels_tof, colors='magenta', linestyles='dashed', linewidths=1.0)
     tof_labels = ax.clabel(CS2, inline=1, fontsize=10, fmt='%d d')
 
     # Palette UX: Add black outline to TOF labels to ensure readability on high-energy (yellow) regions
@@ -274,8 +349,9 @@ def plot_porkchop(launch_dates, arrival_dates, C3, TOF, filename='astrochop.png'
 
             # Smart Label Placement: Avoid cutting off text at edges by pointing towards center
             # Calculate relative position in the plot window (0.0 to 1.0)
-            x_min, x_max = mdates.date2num(min(launch_dates)), mdates.date2num(max(launch_dates))
-            y_min, y_max = mdates.date2num(min(arrival_dates)), mdates.date2num(max(arrival_dates))
+            # (from the axes already converted above rather than the date lists)
+            x_min, x_max = X_dates.min(), X_dates.max()
+            y_min, y_max = Y_dates.min(), Y_dates.max()
 
             x_rel = (opt_launch_num - x_min) / (x_max - x_min)
             y_rel = (opt_arrival_num - y_min) / (y_max - y_min)
@@ -1,5 +1,23 @@
 import numpy as np
 
+# Triangles per BVH leaf (see PorkchopMesh.build_bvh)
+BVH_LEAF_SIZE = 8
+
+# Stand-in for zero ray-direction components in the BVH slab test, so that
+# 1 / dir stays finite and a ray lying in a box face still counts as inside
+_RAY_DIR_TINY = 1e-30
+
+def _spread_bits_3d(q):
+    """
+    Spaces the low 10 bits of each uint64 in q two zero bits apart
+    (bit k moves to bit 3k), for interleaving into 3-D Morton codes.
+    """
+    q = (q | (q << np.uint64(16))) & np.uint64(0x030000FF)
+    q = (q | (q << np.uint64(8))) & np.uint64(0x0300F00F)
+    q = (q | (q << np.uint64(4))) & np.uint64(0x030C30C3)
+    q = (q | (q << np.uint64(2))) & np.uint64(0x09249249)
+    return q
+
 class DataGrid:
     """
     Holds the 2D data for the porkchop plot.
@@ -26,6 +44,18 @@ class DataGrid:
     def height(self):
         return len(self.y_axis)
 
+    @property
+    def extent(self):
+        """
+        (x_min, x_max, y_min, y_max) of the axes, as matplotlib's extent=
+        expects, or None for an empty grid. Read from the current axes, so
+        it follows in-place shifts such as centring them.
+        """
+        if not (self.x_axis.size and self.y_axis.size):
+            return None
+        return (float(self.x_axis.min()), float(self.x_axis.max()),
+                float(self.y_axis.min()), float(self.y_axis.max()))
+
 class PorkchopMesh:
     """
     Generates a mesh from a DataGrid.
@@ -39,14 +69,19 @@ class PorkchopMesh:
         self.x_bounds = None
         self.y_bounds = None
         self.z_bounds = None
+        self._bvh = None # Built on demand by build_bvh
 
-    def generate_mesh(self, z_scale=1.0, morph_type='linear'):
+    def generate_mesh(self, z_scale=1.0, morph_type='linear', dtype=np.float64):
         """
         Generates vertices and indices for the mesh.
 
         Args:
             z_scale (float): Scaling factor for the Z-axis height.
             morph_type (str): 'linear', 'log_e', or 'log_10'. Transforms the Z values.
+            dtype (np.dtype): Precision of the vertices, scalars and UVs.
+                np.float32 halves their memory and matches the Float32 VTP
+                export (which then needs no conversion); keep float64 for
+                uncentred axes such as raw JDs.
         """
         nx = self.grid.width
         ny = self.grid.height
@@ -55,47 +90,64 @@ class PorkchopMesh:
         raw_data = self.grid.data.copy()
 
         # Handle NaNs or Infs
-        raw_data = np.nan_to_num(raw_data, nan=np.nanmax(raw_data) if not np.isnan(raw_data).all() else 0.0)
-
-        if morph_type == 'log_e':
-            # Avoid log(0) or log(negative)
-            mask = raw_data > 0
-            morphed_data = np.zeros_like(raw_data)
-            morphed_data[mask] = np.log(raw_data[mask])
-            morphed_data[~mask] = np.min(morphed_data[mask]) if np.any(mask) else 0
-        elif morph_type == 'log_10':
-            mask = raw_data > 0
-            morphed_data = np.zeros_like(raw_data)
-            morphed_data[mask] = np.log10(raw_data[mask])
-            morphed_data[~mask] = np.min(morphed_data[mask]) if np.any(mask) else 0
+        # (in place: raw_data is already our own copy of the grid)
+        # Optimization: One isfinite pass settles the common all-finite grid;
+        # otherwise a single fmax reduction gives the fill value (the largest
+        # non-NaN value, NaN only if every value is NaN)
+        if not np.isfinite(raw_data).all():
+            fill = np.fmax.reduce(raw_data, axis=None)
+            raw_data = np.nan_to_num(raw_data, copy=False, nan=0.0 if np.isnan(fill) else fill)
+
+        if morph_type in ('log_e', 'log_10'):
+            # Optimization: Take the log of the whole grid, letting log(0) and
+            # log(negative) produce -inf/NaN, then patch only those cells; an
+            # all-positive grid needs no masked gather or scatter at all
+            log = np.log if morph_type == 'log_e' else np.log10
+            non_positive = raw_data <= 0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                morphed_data = log(raw_data)
+            if non_positive.any():
+                # Non-positive values take the smallest log of the positive ones
+                morphed_data[non_positive] = np.nan
+                fill = np.fmin.reduce(morphed_data, axis=None)
+                morphed_data[non_positive] = 0 if np.isnan(fill) else fill
         else: # linear
             morphed_data = raw_data
 
-        self.scalars = morphed_data
+        # Optimization: The per-point arrays share the vertex precision, so a
+        # float32 mesh is exported straight from its own buffers
+        self.scalars = morphed_data.astype(dtype, copy=False)
 
         # 2. Normalize for UVs/Coloring (0..1)
         d_min = np.min(morphed_data)
         d_max = np.max(morphed_data)
         if d_max > d_min:
-            self.uvs = (morphed_data - d_min) / (d_max - d_min)
+            self.uvs = ((morphed_data - d_min) / (d_max - d_min)).astype(dtype, copy=False)
         else:
-            self.uvs = np.zeros_like(morphed_data)
+            self.uvs = np.zeros_like(morphed_data, dtype=dtype)
 
         # 3. Generate Vertices
         # X maps to x_axis (Launch Date JD)
         # Y maps to y_axis (Arrival Date JD)
         # Z maps to morphed_data * z_scale
 
-        # Use meshgrid for efficiency
-        X, Y = np.meshgrid(self.grid.x_axis, self.grid.y_axis)
+        # Optimization: Fill one contiguous (ny * nx, 3) array through a
+        # (ny, nx, 3) view, broadcasting the axes, instead of materializing
+        # meshgrids, flattened copies and a stacked result
         Z = morphed_data * z_scale
-
-        # Flatten
-        self.vertices = np.stack((X.flatten(), Y.flatten(), Z.flatten()), axis=1)
+        vertices = np.empty((ny * nx, 3), dtype=dtype)
+        grid_view = vertices.reshape(ny, nx, 3)
+        grid_view[:, :, 0] = self.grid.x_axis[np.newaxis, :]
+        grid_view[:, :, 1] = self.grid.y_axis[:, np.newaxis]
+        grid_view[:, :, 2] = Z
+        self.vertices = vertices
 
         # Store bounds
-        self.x_bounds = (np.min(X), np.max(X))
-        self.y_bounds = (np.min(Y), np.max(Y))
+        # (from the axes as they are now: callers may shift them in place
+        # between building the grid and generating the mesh)
+        x_min, x_max, y_min, y_max = self.grid.extent
+        self.x_bounds = (x_min, x_max)
+        self.y_bounds = (y_min, y_max)
         self.z_bounds = (np.min(Z), np.max(Z))
 
         # 4. Generate Indices (Triangles)
@@ -110,135 +162,236 @@ class PorkchopMesh:
 
         # Base indices for top-left corners (v0)
         # Grid is (ny) rows by (nx) columns
-        x_idx = np.arange(nx - 1)
-        y_idx = np.arange(ny - 1)
-        X_idx, Y_idx = np.meshgrid(x_idx, y_idx)
-
-        # Calculate v0 for each quad
-        v0 = Y_idx * nx + X_idx
-
-        # Calculate other vertices relative to v0
-        v1 = v0 + 1
-        v2 = v0 + nx
-        v3 = v2 + 1
-
-        # Flatten arrays to process as list of quads
-        v0 = v0.flatten()
-        v1 = v1.flatten()
-        v2 = v2.flatten()
-        v3 = v3.flatten()
-
-        # Create triangles
-        # T1: v0, v2, v1
-        t1 = np.stack((v0, v2, v1), axis=1)
-
-        # T2: v1, v2, v3
-        t2 = np.stack((v1, v2, v3), axis=1)
+        n_quads = (nx - 1) * (ny - 1)
+        v0 = (np.arange(ny - 1, dtype=np.int32)[:, np.newaxis] * nx +
+              np.arange(nx - 1, dtype=np.int32)[np.newaxis, :])
 
         # Interleave triangles to preserve quad locality (T1_0, T2_0, T1_1, T2_1...)
-        n_quads = (nx - 1) * (ny - 1)
+        # Optimization: Write each corner straight into a (ny-1, nx-1, 2, 3)
+        # view of the int32 index array instead of stacking per-triangle copies
         indices = np.empty((n_quads * 2, 3), dtype=np.int32)
-        indices[0::2] = t1
-        indices[1::2] = t2
+        quads = indices.reshape(ny - 1, nx - 1, 2, 3)
+        # T1: v0, v2, v1
+        quads[:, :, 0, 0] = v0
+        quads[:, :, 0, 1] = v0 + nx
+        quads[:, :, 0, 2] = v0 + 1
+        # T2: v1, v2, v3
+        quads[:, :, 1, 0] = v0 + 1
+        quads[:, :, 1, 1] = v0 + nx
+        quads[:, :, 1, 2] = v0 + (nx + 1)
 
         self.indices = indices
+        # (a BVH of the previous geometry no longer applies)
+        self._bvh = None
 
-    def intersect_ray(self, ray_origin, ray_dir):
+    def build_bvh(self):
         """
-        Finds the intersection of a ray with the mesh.
-        Uses Möller–Trumbore intersection algorithm.
-        Returns the closest intersection distance and triangle index.
-
-        Args:
-            ray_origin (np.array): [x, y, z]
-            ray_dir (np.array): [dx, dy, dz] (should be normalized)
-
-        Returns:
-            (t, triangle_index, point): t is distance, index is index in self.indices.
-            Returns (None, -1, None) if no intersection.
+        Builds the bounding volume hierarchy intersect_ray uses to skip
+        triangles the ray cannot hit. intersect_ray calls this on first use,
+        so building it explicitly only moves that cost up front.
+
+        Triangles are sorted along a Z-order (Morton) curve of their box
+        centres and cut into leaves of BVH_LEAF_SIZE, so every leaf is a
+        compact patch of the mesh. Parent boxes are then merged pairwise,
+        level by level, into an implicit binary tree: node i of a level has
+        children 2i and 2i + 1 on the level below, so no child links are
+        stored and every level is built by one vectorized reduction.
         """
-        # This is a naive O(N) check. A BVH would be better for performance,
-        # but for typical porkchop plots (e.g. 100x100), 20k tris is manageable.
-
-        best_t = float('inf')
-        best_idx = -1
-
-        # Vectorized implementation of Moller-Trumbore
-        # V0: (N, 3), V1: (N, 3), V2: (N, 3)
         tris = self.indices
         v0s = self.vertices[tris[:, 0]]
         v1s = self.vertices[tris[:, 1]]
         v2s = self.vertices[tris[:, 2]]
+        lo = np.minimum(np.minimum(v0s, v1s), v2s).astype(np.float64, copy=False)
+        hi = np.maximum(np.maximum(v0s, v1s), v2s).astype(np.float64, copy=False)
+
+        # Morton order of the box centres, quantized to 10 bits per axis
+        mesh_lo = lo.min(axis=0)
+        extent = hi.max(axis=0) - mesh_lo
+        centres = (lo + hi) * 0.5
+        centres -= mesh_lo
+        centres *= 1023.0 / np.where(extent > 0, extent, 1.0)
+        q = centres.astype(np.uint64)
+        codes = _spread_bits_3d(q[:, 0]) << np.uint64(2)
+        codes |= _spread_bits_3d(q[:, 1]) << np.uint64(1)
+        codes |= _spread_bits_3d(q[:, 2])
+        order = np.argsort(codes, kind='stable')
+
+        # Leaves: BVH_LEAF_SIZE consecutive triangles of that order (-1 pads the last one)
+        n_leaves = -(-len(order) // BVH_LEAF_SIZE)
+        leaf_tris = np.full(n_leaves * BVH_LEAF_SIZE, -1, dtype=np.intp)
+        leaf_tris[:len(order)] = order
+        leaf_tris = leaf_tris.reshape(n_leaves, BVH_LEAF_SIZE)
+
+        pad_lo = np.full((len(leaf_tris.ravel()) - len(order), 3), np.inf)
+        node_lo = np.concatenate([lo[order], pad_lo]).reshape(n_leaves, BVH_LEAF_SIZE, 3).min(axis=1)
+        node_hi = np.concatenate([hi[order], -pad_lo]).reshape(n_leaves, BVH_LEAF_SIZE, 3).max(axis=1)
+        # Pad the leaves slightly so rays through shared edges and vertices
+        # are not lost to rounding in the slab test
+        margin = 1e-7 * max(extent.max(), 1.0)
+        node_lo -= margin
+        node_hi += margin
+
+        # Optimization: Each triangle's v0 and edges are computed once here, in
+        # leaf order with one row per component, so intersect_ray gathers
+        # them instead of recomputing (N, 3) edge arrays for every ray
+        # (padding slots stay all zero: degenerate, so never hit)
+        slot_geometry = np.zeros((9, n_leaves * BVH_LEAF_SIZE), dtype=self.vertices.dtype)
+        slot_geometry[0:3, :len(order)] = v0s[order].T
+        slot_geometry[3:6, :len(order)] = (v1s - v0s)[order].T
+        slot_geometry[6:9, :len(order)] = (v2s - v0s)[order].T
+
+        levels = [(node_lo, node_hi)]
+        while len(node_lo) > 1:
+            if len(node_lo) % 2:
+                # An only child: its parent gets the same box
+                node_lo = np.concatenate([node_lo, node_lo[-1:]])
+                node_hi = np.concatenate([node_hi, node_hi[-1:]])
+            node_lo = np.minimum(node_lo[0::2], node_lo[1::2])
+            node_hi = np.maximum(node_hi[0::2], node_hi[1::2])
+            levels.append((node_lo, node_hi))
+
+        # (levels, triangle index per leaf slot, per-slot v0/edge1/edge2 rows)
+        self._bvh = (levels, leaf_tris.ravel(), slot_geometry)
+
+    def _candidate_slots(self, ray_origins, ray_dirs):
+        """
+        (ray, leaf slot) pairs for the BVH leaves (see build_bvh) whose boxes
+        each ray passes through, as two index arrays. The tree is walked
+        breadth-first, one level per step, testing the whole frontier of
+        (ray, box) pairs of all rays at once.
+        """
+        levels = self._bvh[0]
+
+        ray_dirs = np.where(np.abs(ray_dirs) < _RAY_DIR_TINY, np.copysign(_RAY_DIR_TINY, ray_dirs), ray_dirs)
+        inv_dirs = 1.0 / ray_dirs
+
+        rays = np.arange(len(ray_origins))
+        nodes = np.zeros(len(ray_origins), dtype=np.intp)
+        for depth in range(len(levels) - 1, -1, -1):
+            node_lo, node_hi = levels[depth]
+            # Slab test: entry and exit distances of each ray through its box
+            origins = ray_origins[rays]
+            inv_dir = inv_dirs[rays]
+            t1 = (node_lo[nodes] - origins) * inv_dir
+            t2 = (node_hi[nodes] - origins) * inv_dir
+            t_enter = np.minimum(t1, t2).max(axis=1)
+            t_exit = np.maximum(t1, t2).min(axis=1)
+            passed = (t_enter <= t_exit) & (t_exit >= 0.0)
+            rays = rays[passed]
+            nodes = nodes[passed]
+            if depth == 0 or len(nodes) == 0:
+                break
+            rays = np.concatenate([rays, rays])
+            nodes = np.concatenate([2 * nodes, 2 * nodes + 1])
+            exists = nodes < len(levels[depth - 1][0])
+            rays = rays[exists]
+            nodes = nodes[exists]
+
+        slots = (nodes[:, np.newaxis] * BVH_LEAF_SIZE + np.arange(BVH_LEAF_SIZE)).ravel()
+        return np.repeat(rays, BVH_LEAF_SIZE), slots
+
+    def intersect_rays(self, ray_origins, ray_dirs):
+        """
+        Finds the closest intersection of each of many rays with the mesh
+        (batched intersect_ray).
 
-        edge1 = v1s - v0s
-        edge2 = v2s - v0s
+        Optimization: The BVH walk and Möller–Trumbore run once for the whole
+        batch, over (ray, triangle) pairs, instead of once per ray in Python.
 
-        h = np.cross(ray_dir, edge2)
-        a = np.einsum('ij,ij->i', edge1, h)
+        Args:
+            ray_origins (np.array): (M, 3) ray origins.
+            ray_dirs (np.array): (M, 3) ray directions (should be normalized).
+
+        Returns:
+            (t, triangle_indices, points): (M,) distances, (M,) indices into
+            self.indices and (M, 3) points. Rays that miss get NaN, -1 and NaN.
+        """
+        ray_origins = np.asarray(ray_origins, dtype=np.float64).reshape(-1, 3)
+        ray_dirs = np.asarray(ray_dirs, dtype=np.float64).reshape(-1, 3)
+        n_rays = len(ray_origins)
+
+        best_idx = np.full(n_rays, -1, dtype=np.intp)
+        if len(self.indices) == 0:
+            return np.full(n_rays, np.nan), best_idx, np.full((n_rays, 3), np.nan)
+        if self._bvh is None:
+            self.build_bvh()
+        _, slot_tris, slot_geometry = self._bvh
+        best_t = np.full(n_rays, np.nan, dtype=slot_geometry.dtype)
+
+        # Optimization: Only the triangles in BVH leaves a ray passes through
+        # are tested (see build_bvh), instead of every triangle of the mesh
+        rays, slots = self._candidate_slots(ray_origins, ray_dirs)
+
+        # Vectorized implementation of Moller-Trumbore, one lane per (ray, triangle)
+        # Optimization: Per component rows of the precomputed v0/edges, so the
+        # cross and dot products are lane-wise products of contiguous arrays
+        # (no np.cross/einsum over (N, 3) temporaries)
+        v0x, v0y, v0z, e1x, e1y, e1z, e2x, e2y, e2z = slot_geometry[:, slots]
+        # (in the mesh precision, as plain float scalars would be)
+        ox, oy, oz = ray_origins.astype(slot_geometry.dtype, copy=False)[rays].T
+        dx, dy, dz = ray_dirs.astype(slot_geometry.dtype, copy=False)[rays].T
+
+        # h = dir x edge2, a = edge1 . h
+        hx = dy * e2z - dz * e2y
+        hy = dz * e2x - dx * e2z
+        hz = dx * e2y - dy * e2x
+        a = e1x * hx + e1y * hy + e1z * hz
 
         # Parallel check (epsilon)
         epsilon = 1e-7
         # We assume culling is disabled (back-faces visible) for now, or check sign of a
 
-        mask = np.abs(a) > epsilon
-
-        f = 1.0 / a[mask]
-        s = ray_origin - v0s[mask]
-        u = f * np.einsum('ij,ij->i', s, h[mask])
-
-        mask_u = (u >= 0.0) & (u <= 1.0)
-
-        # Refine mask
-        valid_indices = np.where(mask)[0][mask_u]
-        if len(valid_indices) == 0:
-            return None, -1, None
-
-        # q = s x edge1
-        # v = f * (dir . q)
-
-        # We need to re-slice arrays based on current valid set to save computation?
-        # Let's just do it for the reduced set.
-
-        # Re-calc subset
-        v0s = v0s[valid_indices]
-        edge1 = edge1[valid_indices]
-        edge2 = edge2[valid_indices]
-
-        h = np.cross(ray_dir, edge2)
-        a = np.einsum('ij,ij->i', edge1, h)
-        f = 1.0 / a
-        s = ray_origin - v0s
-        u = f * np.einsum('ij,ij->i', s, h)
+        # Optimization: u, v and t are computed for every candidate and tested
+        # with one combined mask, instead of gathering the survivors of each
+        # test (a few hundred candidates: the gathers cost more than they save)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f = 1.0 / a
+
+            # s = origin - v0, u = f * (s . h)
+            sx = ox - v0x
+            sy = oy - v0y
+            sz = oz - v0z
+            u = f * (sx * hx + sy * hy + sz * hz)
+
+            # q = s x edge1, v = f * (dir . q)
+            qx = sy * e1z - sz * e1y
+            qy = sz * e1x - sx * e1z
+            qz = sx * e1y - sy * e1x
+            v = f * (dx * qx + dy * qy + dz * qz)
+
+            # t = f * (edge2 . q)
+            t = f * (e2x * qx + e2y * qy + e2z * qz)
+
+        hit = ((np.abs(a) > epsilon) & (u >= 0.0) & (u <= 1.0) &
+               (v >= 0.0) & (u + v <= 1.0) & (t > epsilon))
+
+        # Closest hit per ray; on exact ties, the lowest triangle index
+        hit_rays = rays[hit]
+        hit_t = t[hit]
+        hit_tris = slot_tris[slots[hit]]
+        order = np.lexsort((hit_tris, hit_t, hit_rays))
+        first = order[np.r_[True, hit_rays[order[1:]] != hit_rays[order[:-1]]]] if len(order) else order
+        best_t[hit_rays[first]] = hit_t[first]
+        best_idx[hit_rays[first]] = hit_tris[first]
+
+        points = ray_origins + ray_dirs * best_t[:, np.newaxis]
+        return best_t, best_idx, points
 
-        q = np.cross(s, edge1)
-        v = f * np.einsum('j,ij->i', ray_dir, q)
-
-        mask_v = (v >= 0.0) & (u + v <= 1.0)
-
-        valid_indices_final = valid_indices[mask_v]
-
-        if len(valid_indices_final) == 0:
-            return None, -1, None
-
-        # Calculate t
-        # t = f * (edge2 . q)
-        q = q[mask_v]
-        edge2 = edge2[mask_v]
-        f = f[mask_v]
-
-        t = f * np.einsum('ij,ij->i', edge2, q)
-
-        mask_t = t > epsilon
+    def intersect_ray(self, ray_origin, ray_dir):
+        """
+        Finds the intersection of a ray with the mesh.
+        Uses Möller–Trumbore intersection algorithm.
+        Returns the closest intersection distance and triangle index.
 
-        valid_indices_final = valid_indices_final[mask_t]
-        t_final = t[mask_t]
+        Args:
+            ray_origin (np.array): [x, y, z]
+            ray_dir (np.array): [dx, dy, dz] (should be normalized)
 
-        if len(t_final) == 0:
+        Returns:
+            (t, triangle_index, point): t is distance, index is index in self.indices.
+            Returns (None, -1, None) if no intersection.
+        """
+        t, idx, points = self.intersect_rays(np.reshape(ray_origin, (1, 3)), np.reshape(ray_dir, (1, 3)))
+        if idx[0] < 0:
             return None, -1, None
-
-        min_arg = np.argmin(t_final)
-        best_t = t_final[min_arg]
-        best_idx = valid_indices_final[min_arg]
-
-        point = ray_origin + ray_dir * best_t
-        return best_t, best_idx, point
+        return t[0], idx[0], points[0]
@@ -0,0 +1,56 @@
+
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from lambert import lambert
+from ephemeris import MU_SUN
+
+def make_grid(M, N, seed=0):
+    """
+    Builds porkchop-shaped inputs for lambert.
+
+    Positions are kept in their broadcastable form (launch (1, N, 3) vs
+    arrival (M, 1, 3)) rather than materialized to (M, N, 3): lambert only
+    reduces them with einsum, so full-grid copies would just be 2*M*N*3
+    doubles of wasted memory traffic before any math happens.
+    """
+    rng = np.random.default_rng(seed)
+
+    ang1 = rng.uniform(0, 2 * np.pi, N)
+    ang2 = rng.uniform(0, 2 * np.pi, M)
+
+    r1 = np.empty((1, N, 3))
+    r1[0, :, 0] = 1.496e8 * np.cos(ang1)
+    r1[0, :, 1] = 1.496e8 * np.sin(ang1)
+    r1[0, :, 2] = 0.0
+
+    r2 = np.empty((M, 1, 3))
+    r2[:, 0, 0] = 2.279e8 * np.cos(ang2)
+    r2[:, 0, 1] = 2.279e8 * np.sin(ang2)
+    r2[:, 0, 2] = 1.0e6
+
+    dt = rng.uniform(150, 400, (M, N)) * 86400.0
+    return r1, r2, dt
+
+def benchmark():
+    for M, N in ((100, 100), (1000, 1000)):
+        r1, r2, dt = make_grid(M, N)
+        print(f"Benchmarking {M}x{N} grid...")
+
+        # Warmup
+        lambert(r1[:, :10], r2[:10], dt[:10, :10], MU_SUN)
+
+        runs = 5 if M * N <= 10_000 else 2
+        for dtype in (np.float64, np.float32):
+            start = time.time()
+            for _ in range(runs):
+                lambert(r1, r2, dt, MU_SUN, dtype=dtype)
+            end = time.time()
+            print(f"  lambert ({np.dtype(dtype).name}): {(end-start)/runs:.6f} s")
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,5 +1,8 @@
 import unittest
-from cli_utils import format_duration, get_c3_color, get_c3_rating, get_vinf_rating, Style
+import io
+from unittest.mock import patch
+import numpy as np
+from cli_utils import format_duration, format_durations, get_c3_color, get_c3_rating, get_vinf_rating, Style, Spinner
 
 class TestCliUx(unittest.TestCase):
     def test_format_duration_days_only(self):
@@ -18,6 +21,12 @@ class TestCliUx(unittest.TestCase):
         self.assertEqual(format_duration(400), "1 year, 1 month")
         self.assertEqual(format_duration(750), "2 years, 1 month")
 
+    def test_format_duration_numpy_values(self):
+        # Values pulled out of NumPy results, including unhashable 0-d arrays
+        self.assertEqual(format_duration(np.array(45.0)), "1 month, 15 days")
+        self.assertEqual(format_duration(np.float32(25.0), short=True), "25.0 d")
+        self.assertEqual(format_duration(np.int64(400)), "1 year, 1 month")
+
     def test_get_c3_color(self):
         # Excellent < 15
         self.assertEqual(get_c3_color(10.0), Style.GREEN)
@@ -58,3 +67,38 @@ class TestCliUx(unittest.TestCase):
         # Years
         self.assertEqual(format_duration(400, short=True), "1 yr, 1 mo")
         self.assertEqual(format_duration(750, short=True), "2 yr, 1 mo")
+
+    def test_format_durations_matches_scalar(self):
+        days = [0.5, 1.0, 25.0, 29.99, 30.0, 45, 60.8, 65, 364.9, 365.25, 400, 730.5, 750]
+        for short in (False, True):
+            expected = [format_duration(d, short=short) for d in days]
+            self.assertEqual(format_durations(days, short=short), expected)
+
+        # Non-finite durations: both raise, rather than format garbage counts
+        for bad in (np.nan, np.inf):
+            with self.assertRaises(ValueError):
+                format_duration(bad)
+            with self.assertRaises(ValueError):
+                format_durations([45.0, bad])
+        self.assertEqual(format_durations([-np.inf]), [format_duration(-np.inf)])
+
+    def _spin_once(self, stdout):
+        spinner = Spinner("Working", delay=10)
+        spinner.is_tty = True # draw frames even though tests are not on a TTY
+        with patch('sys.stdout', stdout):
+            with spinner:
+                pass
+
+    def test_spinner_uses_console_encoding(self):
+        # Legacy code page without the braille spinner characters
+        raw = io.BytesIO()
+        stdout = io.TextIOWrapper(raw, encoding='cp1252', errors='replace')
+        self._spin_once(stdout)
+        stdout.flush()
+        self.assertIn("\r? Working... (0.0s)", raw.getvalue().decode('cp1252'))
+
+    def test_spinner_text_only_stream(self):
+        # No binary buffer (e.g. io.StringIO captures): frames go through write()
+        stdout = io.StringIO()
+        self._spin_once(stdout)
+        self.assertIn(f"\r{Spinner.SPINNER_CHARS[0]} Working... (0.0s)", stdout.getvalue())
@@ -0,0 +1,32 @@
+import unittest
+import numpy as np
+from src.ephemeris import solve_kepler, _perifocal_rotation
+
+class TestEphemerisKepler(unittest.TestCase):
+    def test_kepler_residual(self):
+        # Cover several revolutions and eccentricities from circular to highly elliptical
+        M = np.linspace(-20.0, 20.0, 2001)
+        M_wrapped = np.remainder(M + np.pi, 2 * np.pi) - np.pi
+
+        for e in (0.0, 0.01671022, 0.09341233, 0.5, 0.95):
+            E = solve_kepler(M, e)
+            residual = E - e * np.sin(E) - M_wrapped
+            np.testing.assert_allclose(residual, 0.0, atol=1e-14, err_msg=f"e={e}")
+
+    def test_kepler_scalar(self):
+        E = solve_kepler(1.0, 0.1)
+        self.assertEqual(np.ndim(E), 0)
+        self.assertAlmostEqual(E - 0.1 * np.sin(E), 1.0, places=14)
+
+    def test_perifocal_rotation_matches_product(self):
+        def R3(a):
+            return np.array([[np.cos(a), -np.sin(a), 0], [np.sin(a), np.cos(a), 0], [0, 0, 1]])
+
+        def R1(a):
+            return np.array([[1, 0, 0], [0, np.cos(a), -np.sin(a)], [0, np.sin(a), np.cos(a)]])
+
+        O, i, w = 0.865, 0.0323, 5.0
+        np.testing.assert_allclose(_perifocal_rotation(O, i, w), R3(O) @ R1(i) @ R3(w), atol=1e-15)
+
+if __name__ == '__main__':
+    unittest.main()
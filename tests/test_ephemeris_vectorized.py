@@ -1,6 +1,6 @@
 import unittest
 import numpy as np
-from src.ephemeris import get_ephemeris
+from src.ephemeris import get_ephemeris, get_ephemerides_batch
 
 class TestEphemerisVectorized(unittest.TestCase):
     def test_vectorized_ephemeris_earth(self):
@@ -45,5 +45,36 @@ class TestEphemerisVectorized(unittest.TestCase):
         self.assertEqual(r.shape, (3,))
         self.assertEqual(v.shape, (3,))
 
+    def test_batch_matches_single_body(self):
+        jd_dep = np.linspace(2453500.0, 2453650.0, 31)
+        jd_arr = np.linspace(2453700.0, 2453900.0, 41)
+        batch = get_ephemerides_batch({'earth': jd_dep, 'mars': jd_arr})
+        for body, jd in (('earth', jd_dep), ('mars', jd_arr)):
+            r_ref, v_ref = get_ephemeris(body, jd)
+            np.testing.assert_allclose(batch[body][0], r_ref, rtol=1e-12)
+            np.testing.assert_allclose(batch[body][1], v_ref, rtol=1e-12)
+
+        # Sequence form allows repeated bodies and scalar JDs
+        (r1, _), (r2, _) = get_ephemerides_batch([('earth', 2451545.0), ('earth', jd_dep)])
+        self.assertEqual(r1.shape, (3,))
+        self.assertEqual(r2.shape, (3, 31))
+
+    def test_out_buffers_reused(self):
+        jd_arr = np.linspace(2451545.0, 2451645.0, 20)
+        r_ref, v_ref = get_ephemeris('mars', jd_arr)
+
+        out_r = np.empty((3, 20))
+        out_v = np.empty((3, 20))
+        r_vec, v_vec = get_ephemeris('mars', jd_arr, out_r=out_r, out_v=out_v)
+        self.assertIs(r_vec, out_r)
+        self.assertIs(v_vec, out_v)
+        np.testing.assert_array_equal(out_r, r_ref)
+        np.testing.assert_array_equal(out_v, v_ref)
+
+        out_r1 = np.empty(3)
+        r1, _ = get_ephemeris('mars', jd_arr[0], out_r=out_r1)
+        self.assertIs(r1, out_r1)
+        np.testing.assert_allclose(r1, r_ref[:, 0], rtol=1e-12)
+
 if __name__ == '__main__':
     unittest.main()
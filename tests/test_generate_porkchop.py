@@ -0,0 +1,26 @@
+import unittest
+import numpy as np
+from datetime import datetime, timedelta
+from plotter import generate_porkchop
+
+class TestGeneratePorkchop(unittest.TestCase):
+    def test_invalid_cells_skipped(self):
+        # Overlapping windows: some arrivals come before their launch
+        launch = [datetime(2005, 6, 1) + timedelta(days=40 * i) for i in range(4)]
+        arrival = [datetime(2005, 7, 1) + timedelta(days=60 * i) for i in range(5)]
+        _, _, C3, Vinf, TOF = generate_porkchop(launch, arrival)
+
+        self.assertEqual(C3.shape, (5, 4))
+        for j, ad in enumerate(arrival):
+            for i, ld in enumerate(launch):
+                if ad <= ld:
+                    self.assertTrue(np.isnan(C3[j, i]) and np.isnan(Vinf[j, i]) and np.isnan(TOF[j, i]))
+                    continue
+                # Same transfer through the full-grid path (a 1x1 window has no invalid cells)
+                _, _, c3, vinf, tof = generate_porkchop([ld], [ad])
+                np.testing.assert_allclose(C3[j, i], c3[0, 0], rtol=1e-8)
+                np.testing.assert_allclose(Vinf[j, i], vinf[0, 0], rtol=1e-8)
+                self.assertEqual(TOF[j, i], tof[0, 0])
+
+if __name__ == '__main__':
+    unittest.main()
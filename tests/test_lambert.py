@@ -1,12 +1,34 @@
 import unittest
 import numpy as np
-from src.lambert import lambert, stumpff_c, stumpff_s
+from src import lambert as lambert_module
+from src.lambert import lambert, stumpff_c, stumpff_s, stumpff_c_s
 
 class TestLambert(unittest.TestCase):
     def test_stumpff(self):
         self.assertAlmostEqual(stumpff_c(0), 0.5)
         self.assertAlmostEqual(stumpff_s(0), 1.0/6.0)
+
+    def test_stumpff_near_zero(self):
+        # The closed forms cancel catastrophically here; the series does not
+        z = np.array([-1e-8, 1e-8, -0.5, 0.5])
+        np.testing.assert_allclose(stumpff_c(z[:2]), 0.5 - z[:2] / 24, rtol=1e-15)
+        np.testing.assert_allclose(stumpff_s(z[:2]), 1.0 / 6.0 - z[:2] / 120, rtol=1e-15)
+        # And it joins the closed forms smoothly across |z| = 1
+        for zi in (0.999999, -0.999999):
+            np.testing.assert_allclose(stumpff_c(np.array([zi])), stumpff_c(np.array([zi * (1 + 2e-6)])), rtol=1e-6)
+        sq = np.sqrt(0.5)
+        self.assertAlmostEqual(stumpff_c(0.5), (1 - np.cos(sq)) / 0.5, places=14)
+        self.assertAlmostEqual(stumpff_s(-0.5), (np.sinh(sq) - sq) / (0.5 * sq), places=14)
         
+    def test_stumpff_scalar_matches_array(self):
+        z = np.array([-30.0, -1.0, -0.3, 0.0, 0.5, 1.0, 30.0])
+        c, s = stumpff_c_s(z)
+        for i, zi in enumerate(z):
+            ci, si = stumpff_c_s(float(zi))
+            self.assertIsInstance(ci, float)
+            self.assertAlmostEqual(ci, c[i], places=15)
+            self.assertAlmostEqual(si, s[i], places=15)
+
     def test_lambert_basic(self):
         # Test case: 90 deg transfer in circular orbit
         # r1 = [R, 0, 0], r2 = [0, R, 0]
@@ -32,6 +54,162 @@ class TestLambert(unittest.TestCase):
         
         np.testing.assert_allclose(v1, [0, v_circ, 0], atol=1e-3)
         np.testing.assert_allclose(v2, [-v_circ, 0, 0], atol=1e-3)
+    def test_lambert_reference_case(self):
+        # Curtis, Orbital Mechanics for Engineering Students, Example 5.2
+        r1 = np.array([5000.0, 10000.0, 2100.0])
+        r2 = np.array([-14600.0, 2500.0, 7000.0])
+        v1, v2 = lambert(r1, r2, 3600.0, 398600.0)
+
+        np.testing.assert_allclose(v1, [-5.9925, 1.9254, 3.2456], atol=1e-3)
+        np.testing.assert_allclose(v2, [-3.3125, -4.1966, -0.38529], atol=1e-3)
+
+    def test_short_hyperbolic_transfers_converge(self):
+        # Short flights sit close to the y = 0 boundary, where t(z) ~ sqrt(z - z_lo)
+        mu = 1.32712440018e11
+        r1 = np.array([[1.5e8, 0.0, 0.0]])
+        ang = np.radians([20.0, 60.0, 120.0, 170.0])
+        r2 = np.stack([2.3e8 * np.cos(ang), 2.3e8 * np.sin(ang), np.full(4, 1e6)], axis=-1)
+        dt = np.array([2.0, 5.0, 10.0, 20.0]) * 86400.0
+
+        v1, _ = lambert(r1, r2, dt, mu)
+
+        # Recover the time of flight from the hyperbolic anomalies of the solution
+        r1n = np.linalg.norm(r1, axis=-1)
+        r2n = np.linalg.norm(r2, axis=-1)
+        a = 1.0 / (2.0 / r1n - np.einsum('ij,ij->i', v1, v1) / mu)
+        self.assertTrue(np.all(a < 0))
+        h = np.cross(r1, v1)
+        e_vec = np.cross(v1, h) / mu - r1 / r1n[:, None]
+        e = np.linalg.norm(e_vec, axis=-1)
+        F1 = np.arccosh((1 - r1n / a) / e) * np.sign(np.einsum('ij,ij->i', r1, v1))
+        F2 = np.arccosh((1 - r2n / a) / e)
+        tof = np.sqrt(-a ** 3 / mu) * ((e * np.sinh(F2) - F2) - (e * np.sinh(F1) - F1))
+        np.testing.assert_allclose(tof, dt, rtol=1e-6)
+
+    def test_blocked_grid_matches_single_block(self):
+        # Porkchop-shaped broadcast inputs: launch (1, N, 3) vs arrival (M, 1, 3)
+        rng = np.random.default_rng(1)
+        ang1 = rng.uniform(0, 2 * np.pi, 7)
+        ang2 = rng.uniform(0, 2 * np.pi, 11)
+        r1 = np.stack([1.496e8 * np.cos(ang1), 1.496e8 * np.sin(ang1), np.zeros(7)], axis=-1)[np.newaxis]
+        r2 = np.stack([2.279e8 * np.cos(ang2), 2.279e8 * np.sin(ang2), np.full(11, 1e6)], axis=-1)[:, np.newaxis]
+        dt = rng.uniform(150, 400, (11, 7)) * 86400.0
+        mu = 1.32712440018e11
+
+        v1_ref, v2_ref = lambert(r1, r2, dt, mu)
+
+        old_block = lambert_module.LAMBERT_BLOCK_SIZE
+        lambert_module.LAMBERT_BLOCK_SIZE = 20  # 2 rows per block, last block partial
+        try:
+            v1, v2 = lambert(r1, r2, dt, mu)
+            v1_threads, v2_threads = lambert(r1, r2, dt, mu, workers=3)
+        finally:
+            lambert_module.LAMBERT_BLOCK_SIZE = old_block
+
+        self.assertEqual(v1.shape, (11, 7, 3))
+        np.testing.assert_array_equal(v1, v1_ref)
+        np.testing.assert_array_equal(v2, v2_ref)
+        np.testing.assert_array_equal(v1_threads, v1_ref)
+        np.testing.assert_array_equal(v2_threads, v2_ref)
+
+    def test_float32_path(self):
+        # Curtis Example 5.2 again, in single precision
+        r1 = np.array([5000.0, 10000.0, 2100.0])
+        r2 = np.array([-14600.0, 2500.0, 7000.0])
+        v1, v2 = lambert(r1, r2, 3600.0, 398600.0, dtype=np.float32)
+
+        self.assertEqual(v1.dtype, np.float32)
+        self.assertEqual(v2.dtype, np.float32)
+        np.testing.assert_allclose(v1, [-5.9925, 1.9254, 3.2456], atol=1e-3)
+        np.testing.assert_allclose(v2, [-3.3125, -4.1966, -0.38529], atol=1e-3)
+
+    def test_float32_near_180_degrees(self):
+        # Nearly opposite positions: A = sqrt(r1 r2 + r1.r2) cancels badly in float32,
+        # so the geometry must stay in the inputs' precision
+        r1 = np.array([[1.496e8, 0.0, 0.0]])
+        r2 = np.array([[-2.279e8, 2e3, 1e3]])
+        dt = np.array([250 * 86400.0])
+        v1_ref, v2_ref = lambert(r1, r2, dt, 1.32712440018e11)
+        v1, v2 = lambert(r1, r2, dt, 1.32712440018e11, dtype=np.float32)
+
+        self.assertEqual(v1.dtype, np.float32)
+        np.testing.assert_allclose(v1, v1_ref, rtol=1e-4)
+        np.testing.assert_allclose(v2, v2_ref, rtol=1e-4)
+
+    def test_per_lane_transfer_mode(self):
+        mu = 1.32712440018e11
+        rng = np.random.default_rng(0)
+        r1 = rng.normal(size=(1, 20, 3)) * 1.5e8
+        r2 = rng.normal(size=(10, 1, 3)) * 2.3e8
+        dt = rng.uniform(100, 400, (10, 20)) * 86400
+
+        v1_short, v2_short = lambert(r1, r2, dt, mu, tm=1)
+        v1_long, v2_long = lambert(r1, r2, dt, mu, tm=-1)
+
+        # Both ways in one call, stacked on a new leading axis
+        v1, v2 = lambert(r1, r2, dt, mu, tm=np.array([1, -1])[:, None, None])
+        self.assertEqual(v1.shape, (2, 10, 20, 3))
+        np.testing.assert_allclose(v1[0], v1_short, rtol=1e-10)
+        np.testing.assert_allclose(v1[1], v1_long, rtol=1e-10)
+        np.testing.assert_allclose(v2[1], v2_long, rtol=1e-10)
+
+        # Or chosen per problem
+        tm = np.where(rng.random((10, 20)) > 0.5, 1, -1)
+        v1, _ = lambert(r1, r2, dt, mu, tm=tm)
+        np.testing.assert_allclose(v1, np.where(tm[..., None] > 0, v1_short, v1_long), rtol=1e-10)
+
+    def test_single_vectors_with_dt_array(self):
+        # One geometry, several times of flight: one result row per dt
+        mu = 1.32712440018e11
+        r1 = np.array([1.5e8, 0.0, 0.0])
+        r2 = np.array([0.0, 2.3e8, 1e6])
+        dts = np.array([200.0, 250.0, 300.0]) * 86400
+        v1, v2 = lambert(r1, r2, dts, mu)
+        self.assertEqual(v1.shape, (3, 3))
+        self.assertEqual(v2.shape, (3, 3))
+        for i, dt in enumerate(dts):
+            v1_i, v2_i = lambert(r1, r2, dt, mu)
+            np.testing.assert_allclose(v1[i], v1_i, rtol=1e-9)
+            np.testing.assert_allclose(v2[i], v2_i, rtol=1e-9)
+
+    def test_out_buffers(self):
+        mu = 1.32712440018e11
+        rng = np.random.default_rng(3)
+        r1 = rng.normal(size=(10, 1, 3)) * 1.5e8
+        r2 = rng.normal(size=(1, 20, 3)) * 2.3e8
+        dt = rng.uniform(100, 300, size=(10, 20)) * 86400
+        v1_ref, v2_ref = lambert(r1, r2, dt, mu)
+
+        out_v1 = np.empty((10, 20, 3))
+        out_v2 = np.empty((10, 20, 3))
+        v1, v2 = lambert(r1, r2, dt, mu, out_v1=out_v1, out_v2=out_v2)
+        self.assertIs(v1, out_v1)
+        self.assertIs(v2, out_v2)
+        np.testing.assert_array_equal(v1, v1_ref)
+        np.testing.assert_array_equal(v2, v2_ref)
+
+        # Single problem (scalar path)
+        out_v1, out_v2 = np.empty(3), np.empty(3)
+        v1, v2 = lambert(r1[0, 0], r2[0, 0], dt[0, 0], mu, out_v1=out_v1, out_v2=out_v2)
+        self.assertIs(v1, out_v1)
+        np.testing.assert_allclose(v1, v1_ref[0, 0], rtol=1e-9)
+        np.testing.assert_allclose(v2, v2_ref[0, 0], rtol=1e-9)
+
+        # Only one buffer given: it is filled, and the other result allocated
+        cases = (((r1, r2, dt), v1_ref, v2_ref),
+                 ((r1[0, 0], r2[0, 0], dt[0, 0]), v1_ref[0, 0], v2_ref[0, 0]))
+        for args, v1_exp, v2_exp in cases:
+            out_v1 = np.empty(v1_exp.shape)
+            v1, v2 = lambert(*args, mu, out_v1=out_v1)
+            self.assertIs(v1, out_v1)
+            np.testing.assert_allclose(v1, v1_exp, rtol=1e-9)
+            np.testing.assert_allclose(v2, v2_exp, rtol=1e-9)
+
+            out_v2 = np.empty(v2_exp.shape)
+            v1, v2 = lambert(*args, mu, out_v2=out_v2)
+            self.assertIs(v2, out_v2)
+            np.testing.assert_allclose(v1, v1_exp, rtol=1e-9)
+            np.testing.assert_allclose(v2, v2_exp, rtol=1e-9)
 
 if __name__ == '__main__':
     unittest.main()
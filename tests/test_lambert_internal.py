@@ -1,6 +1,6 @@
 import unittest
 import numpy as np
-from src.lambert import _compute_term_ratio
+from src.lambert import _compute_term_ratio, _compute_t_internal, _sin_cos, SINCOS_TAN_MIN_SIZE, WORK_ROWS, _initial_z, _initial_z_scalar, _t_dtdz_scalar
 
 class TestLambertInternal(unittest.TestCase):
     def test_mixed_regime(self):
@@ -23,5 +23,83 @@ class TestLambertInternal(unittest.TestCase):
             self.assertAlmostEqual(term[i], t_i[0], msg=f"Term mismatch at index {i} (z={z[i]})")
             self.assertAlmostEqual(ratio[i], r_i[0], msg=f"Ratio mismatch at index {i} (z={z[i]})")
 
+    def test_dtdz_matches_finite_difference(self):
+        # Covers hyperbolic, small-|z| series and elliptic regimes
+        z = np.array([-30.0, -2.0, -0.15, -0.05, 0.0, 0.05, 0.15, 1.0, 10.0, 35.0])
+        r_sum = np.full_like(z, 3.8e8)
+        A = np.full_like(z, 1.2e8)
+        inv_sqrt_mu = 1.0 / np.sqrt(1.32712440018e11)
+
+        dtdz = np.empty_like(z)
+        _compute_t_internal(z, r_sum, A, inv_sqrt_mu, dtdz_out=dtdz)
+
+        h = 1e-6
+        t_plus = _compute_t_internal(z + h, r_sum, A, inv_sqrt_mu)
+        t_minus = _compute_t_internal(z - h, r_sum, A, inv_sqrt_mu)
+        np.testing.assert_allclose(dtdz, (t_plus - t_minus) / (2 * h), rtol=1e-6)
+
+        # Pure regimes take their own fast paths and must agree with the mixed call
+        for sel in (z > 0.1, np.abs(z) < 0.1, z < -0.1):
+            dtdz_pure = np.empty(np.count_nonzero(sel))
+            _compute_t_internal(z[sel], r_sum[sel], A[sel], inv_sqrt_mu, dtdz_out=dtdz_pure)
+            np.testing.assert_allclose(dtdz_pure, dtdz[sel], rtol=1e-12)
+
+        # Scratch rows only replace temporaries; results are unchanged
+        work = np.full((WORK_ROWS, z.size), np.nan)
+        dtdz_work = np.empty_like(z)
+        t_work = _compute_t_internal(z, r_sum, A, inv_sqrt_mu, dtdz_out=dtdz_work, work=work)
+        np.testing.assert_array_equal(t_work, _compute_t_internal(z, r_sum, A, inv_sqrt_mu))
+        np.testing.assert_array_equal(dtdz_work, dtdz)
+
+    def test_scalar_kernel_matches_vectorized(self):
+        # Both kernels, in every regime (the series one most of all)
+        z = np.array([-30.0, -2.0, -0.15, -0.099, -0.05, 0.0, 0.05, 0.099, 0.15, 1.0, 10.0, 35.0])
+        r_sum = np.full_like(z, 3.8e8)
+        A = np.full_like(z, 1.2e8)
+        inv_sqrt_mu = 1.0 / np.sqrt(1.32712440018e11)
+
+        dtdz = np.empty_like(z)
+        t = _compute_t_internal(z, r_sum, A, inv_sqrt_mu, dtdz_out=dtdz)
+        for i in range(z.size):
+            _, t_i, dtdz_i = _t_dtdz_scalar(float(z[i]), 3.8e8, 1.2e8, inv_sqrt_mu)
+            np.testing.assert_allclose(t_i, t[i], rtol=1e-12, err_msg=f"z={z[i]}")
+            np.testing.assert_allclose(dtdz_i, dtdz[i], rtol=1e-10, err_msg=f"z={z[i]}")
+
+    def test_invalid_y_marked_nan(self):
+        # z = -60 lies below the y = 0 boundary for A > 0 but not for A < 0
+        z = np.array([1.0, -60.0, -60.0, -0.5])
+        r_sum = np.full_like(z, 3.8e8)
+        A = np.array([1.2e8, 1.2e8, -1.2e8, 1.2e8])
+        inv_sqrt_mu = 1.0 / np.sqrt(1.32712440018e11)
+
+        dtdz = np.empty_like(z)
+        t = _compute_t_internal(z, r_sum, A, inv_sqrt_mu, dtdz_out=dtdz)
+        np.testing.assert_array_equal(np.isnan(t), [False, True, False, False])
+        self.assertTrue(np.isnan(dtdz[1]))
+        valid = [0, 2, 3]
+        np.testing.assert_array_equal(t[valid], _compute_t_internal(z[valid], r_sum[valid], A[valid], inv_sqrt_mu))
+
+    def test_initial_z_close_to_root(self):
+        mu = 1.32712440018e11
+        inv_sqrt_mu = 1.0 / np.sqrt(mu)
+        # Elliptic (long and short TOF), near-parabolic and hyperbolic transfers, both ways
+        dt = np.array([400.0, 200.0, 60.0, 20.0, 5.0, 400.0, 200.0, 60.0]) * 86400
+        r_sum = np.full_like(dt, 3.8e8)
+        A = np.array([1.2e8, 1.2e8, 1.2e8, 1.2e8, 1.2e8, -1.2e8, -1.2e8, -1.2e8])
+
+        z0 = _initial_z(dt, r_sum, A, mu)
+        t0 = _compute_t_internal(z0, r_sum, A, inv_sqrt_mu)
+        np.testing.assert_allclose(t0 / dt, 1.0, rtol=0.25)
+
+        for i in range(dt.size):
+            self.assertAlmostEqual(_initial_z_scalar(dt[i], r_sum[i], A[i], mu), z0[i], places=9)
+
+    def test_sin_cos_tan_form(self):
+        # Large enough to take the shared-tan path, covering 0 < x < pi
+        x = np.linspace(1e-3, np.pi - 1e-3, 4 * SINCOS_TAN_MIN_SIZE)
+        sa, ca = _sin_cos(x)
+        np.testing.assert_allclose(sa, np.sin(x), rtol=0, atol=1e-15)
+        np.testing.assert_allclose(ca, np.cos(x), rtol=0, atol=1e-15)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,7 @@
 
 import unittest
 import numpy as np
-from lambert import lambert, stumpff_c_s
+from lambert import lambert, lambert_scalar, stumpff_c_s, _lambert_block, _lambert_scalar
 
 class TestLambertScalar(unittest.TestCase):
     def test_scalar_input(self):
@@ -33,5 +33,42 @@ class TestLambertScalar(unittest.TestCase):
         except Exception as e:
             self.fail(f"Scalar zero denom failed: {e}")
 
+    def test_scalar_matches_array_path(self):
+        mu = 1.32712440018e11
+        r1 = np.array([1.5e8, 0.0, 0.0])
+        cases = [
+            (np.array([0.0, 2.3e8, 1e6]), 200 * 86400, 1),   # elliptic
+            (np.array([-1.6e8, 1.6e8, 0.0]), 20 * 86400, 1), # hyperbolic
+            (np.array([0.0, 2.3e8, 1e6]), 400 * 86400, -1),  # long way
+        ]
+        for r2, dt, tm in cases:
+            v1, v2 = lambert(r1, r2, dt, mu, tm=tm)
+            v1_ref, v2_ref = _lambert_block(r1[np.newaxis], r2[np.newaxis], np.atleast_1d(dt), mu, tm, 1e-5, 50)
+            np.testing.assert_allclose(v1, v1_ref[0], rtol=1e-9)
+            np.testing.assert_allclose(v2, v2_ref[0], rtol=1e-9)
+
+    def test_lambert_scalar_entry_point(self):
+        mu = 1.32712440018e11
+        r1 = [1.5e8, 0.0, 0.0]
+        r2 = [0.0, 2.3e8, 1e6]
+        for tm in (1, -1):
+            v1, v2 = lambert_scalar(r1, r2, 200 * 86400, mu, tm=tm)
+            # Against the vectorized solver (lambert() itself would route this
+            # single problem to the same scalar kernel)
+            v1_ref, v2_ref = _lambert_block(np.array([r1]), np.array([r2]), np.array([200 * 86400.0]), mu, tm, 1e-5, 50)
+            np.testing.assert_allclose(v1, v1_ref[0], rtol=1e-9)
+            np.testing.assert_allclose(v2, v2_ref[0], rtol=1e-9)
+
+        # Degenerate input (A == 0 for opposite vectors, dt <= 0), which the
+        # scalar kernel rejects, falls back to the array path
+        for r2_bad, dt_bad in (([-1.5e8, 0.0, 0.0], 200 * 86400.0), (r2, -86400.0)):
+            self.assertIsNone(_lambert_scalar(r1, r2_bad, dt_bad, mu, 1, 1e-5, 50))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                v1, v2 = lambert_scalar(r1, r2_bad, dt_bad, mu)
+                v1_ref, v2_ref = _lambert_block(np.array([r1]), np.array([r2_bad]), np.array([dt_bad]), mu, 1, 1e-5, 50)
+            self.assertEqual(v1.shape, (3,))
+            np.testing.assert_array_equal(v1, v1_ref[0])
+            np.testing.assert_array_equal(v2, v2_ref[0])
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,32 +1,36 @@
 import unittest
 import os
 import shutil
+import tempfile
+import re
+import base64
+import zlib
+from pathlib import Path
 import numpy as np
 from src.porkchop_mesh import DataGrid, PorkchopMesh
 from src.mesh_exporter import write_vtp
 
 class TestMeshExporter(unittest.TestCase):
-    def setUp(self):
-        # Create a simple mesh for testing
+    @classmethod
+    def setUpClass(cls):
+        # Create a simple mesh for testing (read-only, shared by all tests)
         data = np.zeros((2, 2))
         x = [0, 1]
         y = [0, 1]
         grid = DataGrid(data, x, y)
-        self.mesh = PorkchopMesh(grid)
-        self.mesh.generate_mesh()
+        cls.mesh = PorkchopMesh(grid)
+        cls.mesh.generate_mesh()
 
+    def setUp(self):
         # Create a temp dir for output
-        self.test_dir = 'test_output'
-        if not os.path.exists(self.test_dir):
-            os.makedirs(self.test_dir)
+        # (under the working directory, the only place write_vtp writes to)
+        self.test_dir = tempfile.mkdtemp(prefix='test_output_', dir=os.getcwd())
 
     def tearDown(self):
         # Cleanup
-        if os.path.exists(self.test_dir):
-            shutil.rmtree(self.test_dir)
+        shutil.rmtree(self.test_dir, ignore_errors=True)
         # Also clean up any files written to root or parent (if any tests accidentally pass)
-        if os.path.exists('test_output.vtp'):
-            os.remove('test_output.vtp')
+        Path('test_output.vtp').unlink(missing_ok=True)
         # We try to avoid polluting parent dirs
 
     def test_valid_write(self):
@@ -34,6 +38,94 @@ class TestMeshExporter(unittest.TestCase):
         write_vtp(filepath, self.mesh)
         self.assertTrue(os.path.exists(filepath))
 
+    def test_binary_arrays_round_trip(self):
+        filepath = os.path.join(self.test_dir, 'binary.vtp')
+        write_vtp(filepath, self.mesh, appended=False)
+        with open(filepath) as f:
+            payloads = re.findall(r'format="binary">\s*(\S+)\s*<', f.read())
+        self.assertEqual(len(payloads), 5)
+
+        def decode(payload, dtype):
+            raw = base64.b64decode(payload)
+            # UInt32 byte-count header, then the data
+            self.assertEqual(int(np.frombuffer(raw[:4], '<u4')[0]), len(raw) - 4)
+            return np.frombuffer(raw[4:], dtype)
+
+        np.testing.assert_allclose(decode(payloads[0], '<f4').reshape(-1, 3), self.mesh.vertices)
+        np.testing.assert_array_equal(decode(payloads[1], '<i4'), self.mesh.indices.ravel())
+        np.testing.assert_array_equal(decode(payloads[2], '<i4'), np.arange(3, 3 * len(self.mesh.indices) + 1, 3))
+
+    def test_appended_raw_round_trip(self):
+        filepath = os.path.join(self.test_dir, 'appended.vtp')
+        write_vtp(filepath, self.mesh)
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        offsets = [int(o) for o in re.findall(rb'format="appended" offset="(\d+)"', content)]
+        self.assertEqual(len(offsets), 5)
+        start = content.index(b'<AppendedData encoding="raw">')
+        block = content[content.index(b'_', start) + 1:]
+
+        def read(offset, dtype):
+            size = int(np.frombuffer(block[offset:offset + 4], '<u4')[0])
+            return np.frombuffer(block[offset + 4:offset + 4 + size], dtype)
+
+        np.testing.assert_allclose(read(offsets[0], '<f4').reshape(-1, 3), self.mesh.vertices)
+        np.testing.assert_array_equal(read(offsets[1], '<i4'), self.mesh.indices.ravel())
+        np.testing.assert_array_equal(read(offsets[2], '<i4'), np.arange(3, 3 * len(self.mesh.indices) + 1, 3))
+        np.testing.assert_allclose(read(offsets[4], '<f4'), self.mesh.uvs.ravel())
+        self.assertTrue(content.endswith(b'</AppendedData>\n</VTKFile>\n'))
+
+    def test_appended_compressed_round_trip(self):
+        data = np.random.default_rng(0).random((40, 30))
+        mesh = PorkchopMesh(DataGrid(data, np.arange(30.0), np.arange(40.0)))
+        mesh.generate_mesh()
+        filepath = os.path.join(self.test_dir, 'compressed.vtp')
+        write_vtp(filepath, mesh, appended=True, compress=True)
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        self.assertIn(b'compressor="vtkZLibDataCompressor"', content)
+        offsets = [int(o) for o in re.findall(rb'format="appended" offset="(\d+)"', content)]
+        block = content[content.index(b'_', content.index(b'<AppendedData')) + 1:]
+
+        def read(offset, dtype):
+            n_blocks = int(np.frombuffer(block[offset:offset + 4], '<u4')[0])
+            header = np.frombuffer(block[offset:offset + 4 * (3 + n_blocks)], '<u4')
+            pos = offset + 4 * (3 + n_blocks)
+            raw = b''
+            for size in header[3:]:
+                raw += zlib.decompress(block[pos:pos + size])
+                pos += size
+            self.assertEqual(len(raw), (n_blocks - 1) * header[1] + header[2])
+            return np.frombuffer(raw, dtype)
+
+        np.testing.assert_allclose(read(offsets[0], '<f4').reshape(-1, 3), mesh.vertices, rtol=1e-6)
+        np.testing.assert_array_equal(read(offsets[1], '<i4'), mesh.indices.ravel())
+        np.testing.assert_allclose(read(offsets[4], '<f4'), mesh.uvs.ravel(), rtol=1e-6)
+
+    def test_quantized_uvs(self):
+        data = np.random.default_rng(1).random((5, 4))
+        mesh = PorkchopMesh(DataGrid(data, np.arange(4.0), np.arange(5.0)))
+        mesh.generate_mesh()
+        filepath = os.path.join(self.test_dir, 'quantized.vtp')
+        write_vtp(filepath, mesh, quantize_uvs=True)
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        self.assertIn(b'<DataArray type="UInt16" Name="NormalizedUV" format="appended" offset=', content)
+        offset = int(re.findall(rb'format="appended" offset="(\d+)"', content)[4])
+        block = content[content.index(b'_', content.index(b'<AppendedData')) + 1:]
+        size = int(np.frombuffer(block[offset:offset + 4], '<u4')[0])
+        uvs = np.frombuffer(block[offset + 4:offset + 4 + size], '<u2')
+        self.assertEqual(uvs.size, mesh.uvs.size)
+        np.testing.assert_allclose(uvs / 65535.0, mesh.uvs.ravel(), atol=0.5 / 65535)
+
+    def test_ascii_write(self):
+        filepath = os.path.join(self.test_dir, 'ascii.vtp')
+        write_vtp(filepath, self.mesh, binary=False)
+        with open(filepath) as f:
+            content = f.read()
+        self.assertIn('format="ascii"', content)
+        self.assertNotIn('format="binary"', content)
+
     def test_path_traversal(self):
         # Try to write to parent directory
         # We need a filename that includes '..'
@@ -50,10 +142,8 @@ class TestMeshExporter(unittest.TestCase):
             write_vtp(filename, self.mesh)
 
         # Cleanup if it failed to raise (meaning it wrote the file)
-        if os.path.exists('sentinel_test_traversal.vtp'):
-             os.remove('sentinel_test_traversal.vtp')
-        if os.path.exists('../sentinel_test_traversal.vtp'):
-             os.remove('../sentinel_test_traversal.vtp')
+        Path('sentinel_test_traversal.vtp').unlink(missing_ok=True)
+        Path('../sentinel_test_traversal.vtp').unlink(missing_ok=True)
 
     def test_invalid_extension(self):
         filename = os.path.join(self.test_dir, 'wrong_ext.txt')
@@ -0,0 +1,17 @@
+import unittest
+import numpy as np
+from datetime import datetime, timedelta
+from plotter import jd_from_date, jds_from_dates
+
+class TestPlotterDates(unittest.TestCase):
+    def test_jds_from_dates_matches_scalar(self):
+        # Every month, including January/February, with times of day
+        dates = [datetime(1999, 12, 31) + timedelta(days=11.3 * i, seconds=97 * i) for i in range(200)]
+        jds = jds_from_dates(dates)
+
+        self.assertEqual(jds.shape, (200,))
+        np.testing.assert_allclose(jds, [jd_from_date(d) for d in dates], rtol=0, atol=1e-9)
+        self.assertEqual(jds_from_dates([]).shape, (0,))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,7 @@ class TestPorkchopMesh(unittest.TestCase):
         grid = DataGrid(data, x, y)
         self.assertEqual(grid.width, 2)
         self.assertEqual(grid.height, 2)
+        self.assertEqual(DataGrid(data, [3, -1], [5, 7]).extent, (-1.0, 3.0, 5.0, 7.0))
 
     def test_mesh_generation(self):
         data = np.zeros((3, 3))
@@ -33,6 +34,18 @@ class TestPorkchopMesh(unittest.TestCase):
         # 4 cells * 2 tris/cell = 8 tris
         self.assertEqual(len(mesh.indices), 8)
 
+    def test_bounds_follow_shifted_axes(self):
+        # As main.py does: centre the (JD) axes in place after building the grid
+        grid = DataGrid(np.zeros((2, 4)), [2460000.0, 2460001.0, 2460002.0, 2460003.0], [2460100.0, 2460102.0])
+        grid.x_axis -= np.mean(grid.x_axis)
+        grid.y_axis -= np.mean(grid.y_axis)
+        mesh = PorkchopMesh(grid)
+        mesh.generate_mesh()
+
+        self.assertEqual(grid.extent, (-1.5, 1.5, -1.0, 1.0))
+        self.assertEqual(mesh.x_bounds, (mesh.vertices[:, 0].min(), mesh.vertices[:, 0].max()))
+        self.assertEqual(mesh.y_bounds, (mesh.vertices[:, 1].min(), mesh.vertices[:, 1].max()))
+
     def test_intersection(self):
         # 2x2 grid, flat plane at z=0
         data = np.zeros((2, 2))
@@ -58,5 +71,88 @@ class TestPorkchopMesh(unittest.TestCase):
         t, idx, pt = mesh.intersect_ray(ray_origin_miss, ray_dir)
         self.assertIsNone(t)
 
+    def test_float32_vertices(self):
+        data = np.arange(12.0).reshape(3, 4)
+        grid = DataGrid(data, [0, 1, 2, 3], [0, 1, 2])
+        mesh64 = PorkchopMesh(grid)
+        mesh64.generate_mesh(z_scale=0.5)
+        mesh32 = PorkchopMesh(grid)
+        mesh32.generate_mesh(z_scale=0.5, dtype=np.float32)
+
+        self.assertEqual(mesh32.vertices.dtype, np.float32)
+        self.assertTrue(mesh32.vertices.flags['C_CONTIGUOUS'])
+        np.testing.assert_array_equal(mesh32.vertices, mesh64.vertices)
+        np.testing.assert_array_equal(mesh32.indices, mesh64.indices)
+        self.assertEqual(mesh32.scalars.dtype, np.float32)
+        self.assertEqual(mesh32.uvs.dtype, np.float32)
+        np.testing.assert_allclose(mesh32.uvs, mesh64.uvs, rtol=1e-6)
+
+        t, idx, pt = mesh32.intersect_ray(np.array([1.5, 0.5, 10.0]), np.array([0.0, 0.0, -1.0]))
+        self.assertIsNotNone(t)
+        self.assertAlmostEqual(pt[2], 0.5 * (1.5 + 4 * 0.5), places=5)
+
+    def test_bvh_matches_full_scan(self):
+        rng = np.random.default_rng(0)
+        x = np.linspace(-5, 5, 60)
+        y = np.linspace(-3, 3, 45)
+        data = np.sin(x[np.newaxis, :]) * np.cos(y[:, np.newaxis]) + 0.1 * rng.random((45, 60))
+        mesh = PorkchopMesh(DataGrid(data, x, y))
+        mesh.generate_mesh(z_scale=2.0)
+        full_scan = PorkchopMesh(mesh.grid)
+        full_scan.generate_mesh(z_scale=2.0)
+        # Reference: test every triangle
+        full_scan.build_bvh()
+        n_slots = len(full_scan._bvh[1])
+        full_scan._candidate_slots = lambda origins, directions: (
+            np.repeat(np.arange(len(origins)), n_slots), np.tile(np.arange(n_slots), len(origins)))
+
+        hits = 0
+        for _ in range(200):
+            target = mesh.vertices[rng.integers(len(mesh.vertices))] + [rng.uniform(-0.1, 0.1), rng.uniform(-0.1, 0.1), 0.0]
+            origin = target + rng.normal(size=3) * [4.0, 4.0, 1.0]
+            origin[2] = abs(origin[2]) + 0.5
+            direction = (target - origin) / np.linalg.norm(target - origin)
+
+            t, idx, pt = mesh.intersect_ray(origin, direction)
+            t_ref, idx_ref, pt_ref = full_scan.intersect_ray(origin, direction)
+            self.assertEqual(idx, idx_ref)
+            if t_ref is not None:
+                hits += 1
+                self.assertAlmostEqual(t, t_ref, places=12)
+        self.assertGreater(hits, 150)
+
+        # Regenerating the mesh drops the stale hierarchy
+        mesh.generate_mesh(z_scale=0.0)
+        t, idx, pt = mesh.intersect_ray(np.array([0.0, 0.0, 10.0]), np.array([0.0, 0.0, -1.0]))
+        self.assertAlmostEqual(t, 10.0)
+
+    def test_intersect_rays_batch(self):
+        rng = np.random.default_rng(1)
+        x = np.linspace(0, 10, 30)
+        y = np.linspace(0, 8, 25)
+        mesh = PorkchopMesh(DataGrid(rng.random((25, 30)), x, y))
+        mesh.generate_mesh(z_scale=3.0)
+
+        origins = np.column_stack([rng.uniform(-2, 12, 100), rng.uniform(-2, 10, 100), rng.uniform(4, 8, 100)])
+        directions = rng.normal(size=(100, 3)) * [0.3, 0.3, 1.0]
+        directions[:, 2] = -np.abs(directions[:, 2])
+        directions /= np.linalg.norm(directions, axis=1)[:, np.newaxis]
+
+        t, idx, points = mesh.intersect_rays(origins, directions)
+        self.assertEqual(t.shape, (100,))
+        self.assertEqual(points.shape, (100, 3))
+        n_hits = 0
+        for k in range(100):
+            t_k, idx_k, pt_k = mesh.intersect_ray(origins[k], directions[k])
+            self.assertEqual(idx[k], idx_k)
+            if t_k is None:
+                self.assertTrue(np.isnan(t[k]) and np.isnan(points[k]).all())
+            else:
+                n_hits += 1
+                self.assertEqual(t[k], t_k)
+                np.testing.assert_array_equal(points[k], pt_k)
+        self.assertGreater(n_hits, 20)
+        self.assertLess(n_hits, 100)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,22 +1,36 @@
 import unittest
 import numpy as np
 from datetime import datetime
+import matplotlib
+# Non-interactive backend: tests only render to files, never to a window
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-from plotter import plot_porkchop
+from datetime import timedelta
+from plotter import plot_porkchop, _plot_indices, PLOT_MAX_SAMPLES
 import os
+from pathlib import Path
 
 class TestUXPlotter(unittest.TestCase):
-    def setUp(self):
-        self.filename = 'test_plot_ux.png'
+    @classmethod
+    def setUpClass(cls):
+        cls.filename = 'test_plot_ux.png'
         # Create dummy data
-        self.launch_dates = [datetime(2025, 1, 1), datetime(2025, 1, 2)]
-        self.arrival_dates = [datetime(2025, 6, 1), datetime(2025, 6, 2)]
-        self.C3 = np.array([[10, 12], [11, 13]])
-        self.TOF = np.array([[100, 105], [102, 107]])
+        cls.launch_dates = [datetime(2025, 1, 1), datetime(2025, 1, 2)]
+        cls.arrival_dates = [datetime(2025, 6, 1), datetime(2025, 6, 2)]
+        cls.C3 = np.array([[10, 12], [11, 13]], dtype=np.float32)
+        cls.TOF = np.array([[100, 105], [102, 107]], dtype=np.float32)
+
+        # Plot without an optimal transfer, rendered once and shared by the
+        # tests that only inspect the resulting Axes
+        plot_porkchop(cls.launch_dates, cls.arrival_dates, cls.C3, cls.TOF, filename=cls.filename)
+        cls.ax = plt.gca()
+        os.remove(cls.filename)
+        plt.close('all')
 
     def tearDown(self):
-        if os.path.exists(self.filename):
-            os.remove(self.filename)
+        Path(self.filename).unlink(missing_ok=True)
+        # plot_porkchop leaves its figure open; don't accumulate one per test
+        plt.close('all')
 
     def test_plot_porkchop_annotation(self):
         # Test with standard 4-tuple (backwards compatibility)
@@ -49,18 +63,7 @@ class TestUXPlotter(unittest.TestCase):
 
     def test_legend_elements(self):
         """Test that the legend contains the expected custom elements."""
-        plot_porkchop(
-            self.launch_dates,
-            self.arrival_dates,
-            self.C3,
-            self.TOF,
-            filename=self.filename
-        )
-
-        # Get the current figure and axes
-        fig = plt.gcf()
-        ax = plt.gca()
-        legend = ax.get_legend()
+        legend = self.ax.get_legend()
 
         self.assertIsNotNone(legend, "Legend should exist")
         texts = [t.get_text() for t in legend.get_texts()]
@@ -73,16 +76,7 @@ class TestUXPlotter(unittest.TestCase):
 
     def test_contour_labels_path_effects(self):
         """Test that contour labels have path effects applied for readability."""
-        plot_porkchop(
-            self.launch_dates,
-            self.arrival_dates,
-            self.C3,
-            self.TOF,
-            filename=self.filename
-        )
-
-        fig = plt.gcf()
-        ax = plt.gca()
+        ax = self.ax
 
         # Check all text objects in the axes
         # Note: clabel adds text objects to ax.texts
@@ -176,5 +170,25 @@ class TestUXPlotter(unittest.TestCase):
 
         self.assertTrue(found_human_readable, "Annotation should use human-readable duration format (e.g., '6 months, 17 days') instead of abbreviated 'mo'")
 
+    def test_fine_grid_contoured_at_plot_resolution(self):
+        """Test that grids finer than PLOT_MAX_SAMPLES are contoured on a subset spanning the whole axis."""
+        self.assertEqual(_plot_indices(PLOT_MAX_SAMPLES), slice(None))
+        idx = _plot_indices(3 * PLOT_MAX_SAMPLES + 7)
+        self.assertEqual(len(idx), PLOT_MAX_SAMPLES)
+        self.assertEqual((idx[0], idx[-1]), (0, 3 * PLOT_MAX_SAMPLES + 6))
+        self.assertTrue(np.all(np.diff(idx) > 0))
+
+        n = PLOT_MAX_SAMPLES + 200
+        launch_dates = [datetime(2025, 1, 1) + timedelta(hours=i) for i in range(n)]
+        C3 = np.tile(np.linspace(5.0, 45.0, n), (3, 1))
+        plot_porkchop(launch_dates, self.arrival_dates + [datetime(2025, 6, 3)], C3, C3 + 100.0,
+                      filename=self.filename)
+        self.assertTrue(os.path.exists(self.filename))
+
+        # Contoured over the full launch range
+        x_min, x_max = plt.gca().collections[0].get_datalim(plt.gca().transData).intervalx
+        self.assertAlmostEqual(x_min, plt.gca().get_xlim()[0])
+        self.assertAlmostEqual(x_max, plt.gca().get_xlim()[1])
+
 if __name__ == '__main__':
     unittest.main()